@@ -0,0 +1,240 @@
+# app/core/cache.py
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+# Optional shared cache across workers (gunicorn -w N); in-process caches still work without it
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class TTLCache:
+    """Small in-process cache: entries expire after `ttl` seconds, oldest evicted past `maxsize`."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+_MISSING = object()
+
+
+def async_ttl_cached(
+    key: Callable[..., Hashable],
+    ttl: float = 60.0,
+    maxsize: int = 10_000,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+):
+    """
+    Cache an async function's result per `key(*args, **kwargs)` for `ttl` seconds.
+    Concurrent misses on the same key share one in-flight call, so only one hits the backend.
+    `cache_if` decides whether a result is worth keeping (e.g. skip error responses).
+    Invalidate with `fn.cache_invalidate(key)` or `fn.cache_clear()`; a call already in
+    flight then still answers its waiters but does not re-cache its (possibly stale) result.
+    """
+    def decorator(fn):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        inflight: dict = {}
+        generation = 0
+
+        async def fill(k, args, kwargs):
+            started = generation
+            value = await fn(*args, **kwargs)
+            if started == generation and (cache_if is None or cache_if(value)):
+                cache.set(k, value)
+            return value
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs)
+            value = cache.get(k, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            task = inflight.get(k)
+            if task is None:
+                task = asyncio.ensure_future(fill(k, args, kwargs))
+                inflight[k] = task
+                # Only drop our own entry: an invalidation may have started a newer fill
+                task.add_done_callback(lambda t: inflight.pop(k) if inflight.get(k) is t else None)
+            # shield: one caller disconnecting must not cancel the fill for the others
+            return await asyncio.shield(task)
+
+        def invalidate(k: Hashable, default: Any = None) -> Any:
+            nonlocal generation
+            generation += 1
+            inflight.pop(k, None)
+            return cache.pop(k, default)
+
+        def clear() -> None:
+            nonlocal generation
+            generation += 1
+            inflight.clear()
+            cache.clear()
+
+        wrapper.cache = cache
+        wrapper.cache_invalidate = invalidate
+        wrapper.cache_clear = clear
+        return wrapper
+
+    return decorator
+
+
+def coalesce_inflight(key: Callable[..., Hashable]):
+    """
+    Share one in-flight call between concurrent callers with the same `key(*args, **kwargs)`.
+    Nothing is kept once the call finishes; this only collapses simultaneous identical requests.
+    """
+    def decorator(fn):
+        inflight: dict = {}
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs)
+            task = inflight.get(k)
+            if task is None:
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                inflight[k] = task
+                task.add_done_callback(lambda _: inflight.pop(k, None))
+            # shield: one caller disconnecting must not cancel the query for the others
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorator
+
+
+class BatchLoader:
+    """
+    DataLoader-style batching: `load(key)` calls made in the same event-loop tick are
+    collected and resolved with one `batch_fn(keys) -> {key: value}` call.
+    Keys missing from the returned dict resolve to None.
+    """
+
+    def __init__(self, batch_fn: Callable[[list], Any], max_batch_size: int = 100):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._pending: dict = {}
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = self._pending[key] = loop.create_future()
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for i in range(0, len(keys), self.max_batch_size):
+            chunk = {key: pending[key] for key in keys[i:i + self.max_batch_size]}
+            asyncio.ensure_future(self._run(chunk))
+
+    async def _run(self, futures: dict) -> None:
+        try:
+            results = await self.batch_fn(list(futures))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+# --- Shared (Redis) cache ---
+# Every helper is a no-op without REDIS_URL / the redis package, and Redis errors are
+# logged and swallowed: the shared cache must never take an endpoint down.
+
+_redis_client = None
+
+
+def get_redis():
+    """Shared Redis client, or None when REDIS_URL isn't set or redis isn't installed."""
+    global _redis_client
+    if _redis_client is None and settings.REDIS_URL:
+        if not REDIS_AVAILABLE:
+            log.warning("REDIS_URL is set but the redis package is not installed. Shared cache disabled.")
+            return None
+        _redis_client = aioredis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+async def shared_get(key: str) -> Optional[bytes]:
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        return await redis.get(key)
+    except Exception as e:
+        log.warning(f"Shared cache get failed for {key}: {e}")
+        return None
+
+
+async def shared_set(key: str, value: bytes, ttl: int) -> None:
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.set(key, value, ex=ttl)
+    except Exception as e:
+        log.warning(f"Shared cache set failed for {key}: {e}")
+
+
+async def shared_delete(*keys: str) -> None:
+    redis = get_redis()
+    if redis is None or not keys:
+        return
+    try:
+        await redis.delete(*keys)
+    except Exception as e:
+        log.warning(f"Shared cache delete failed for {keys}: {e}")
+
+
+async def shared_lock(key: str, ttl: int) -> bool:
+    """SET NX lock so only one worker recomputes a missing entry; True without Redis."""
+    redis = get_redis()
+    if redis is None:
+        return True
+    try:
+        return bool(await redis.set(key, b"1", nx=True, ex=ttl))
+    except Exception as e:
+        log.warning(f"Shared cache lock failed for {key}: {e}")
+        return True
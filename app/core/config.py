@@ -18,6 +18,15 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_KEY: SecretStr
     SUPABASE_PROJECT_ID: str
     
+    # Supabase HTTP connection pool (per client, keep-alive + HTTP/2)
+    SUPABASE_HTTP_TIMEOUT: float = 30.0
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 40
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 20
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    
+    # Optional Redis for caches shared between workers (e.g. redis://localhost:6379/0)
+    REDIS_URL: str | None = None
+    
     # Security configuration
     SECRET_KEY: SecretStr
     ALGORITHM: str = "HS256"
@@ -36,6 +45,9 @@ class Settings(BaseSettings):
     # This should be empty by default and populated by users as needed
     CUSTOM_BAD_WORDS: str = ""
     
+    # Workshop search: full-text (stemmed words, indexed) or substring ILIKE on title/description
+    WORKSHOP_SEARCH_FULL_TEXT: bool = True
+    
     # Brevo Email Configuration
     BREVO_API_KEY: SecretStr
     BREVO_SENDER_EMAIL: str
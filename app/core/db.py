@@ -1,6 +1,7 @@
 # app/core/db.py
 
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions, AsyncClient, AsyncClientOptions
 # Import the central settings object
 from .config import settings
 # Import your logger setup function
@@ -9,24 +10,90 @@ from .logger import setup_logger
 # Set up the logger for this module
 log = setup_logger(__name__)
 
+# orjson decodes the PostgREST payloads (nested joins) much faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    log.warning("orjson not installed. Falling back to stdlib json for Supabase responses.")
+
+
+def _use_orjson(response: httpx.Response) -> None:
+    """Response hook: make response.json() decode with orjson."""
+    response.json = lambda **kwargs: orjson.loads(response.content)
+
+
+async def _use_orjson_async(response: httpx.Response) -> None:
+    """Async response hook for the AsyncClient transports."""
+    _use_orjson(response)
+
+
+def _http_client_kwargs() -> dict:
+    """Pool, timeout and protocol settings shared by the sync and async HTTP clients."""
+    return dict(
+        timeout=settings.SUPABASE_HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        follow_redirects=True,
+        http2=True,
+    )
+
+
+def _build_http_client() -> httpx.Client:
+    """
+    Build the pooled httpx client used by a Supabase client's PostgREST session.
+    Keep-alive connections are reused across requests, so TLS handshakes are paid once.
+    postgrest rebinds base_url and headers on the client it is given,
+    so every Supabase client needs its own instance.
+    """
+    event_hooks = {"response": [_use_orjson]} if ORJSON_AVAILABLE else {}
+    return httpx.Client(event_hooks=event_hooks, **_http_client_kwargs())
+
+
+def _build_async_http_client() -> httpx.AsyncClient:
+    """Async counterpart of _build_http_client, for the AsyncClient Supabase clients."""
+    event_hooks = {"response": [_use_orjson_async]} if ORJSON_AVAILABLE else {}
+    return httpx.AsyncClient(event_hooks=event_hooks, **_http_client_kwargs())
+
 supabase_client: Client | None = None
 supabase_admin_client: Client | None = None
+async_supabase_client: AsyncClient | None = None
+async_supabase_admin_client: AsyncClient | None = None
 
 try:
     # Use the validated settings to create the standard client
     supabase_client = create_client(
         str(settings.SUPABASE_URL), # Convert AnyHttpUrl to string
-        settings.SUPABASE_ANON_KEY
+        settings.SUPABASE_ANON_KEY,
+        options=ClientOptions(httpx_client=_build_http_client())
     )
     log.debug("✅ Supabase standard client (anon) initialized.")
 
     # Use the secure settings to create the admin client
     supabase_admin_client = create_client(
         str(settings.SUPABASE_URL),
-        settings.SUPABASE_SERVICE_KEY.get_secret_value() # Get the real secret value
+        settings.SUPABASE_SERVICE_KEY.get_secret_value(), # Get the real secret value
+        options=ClientOptions(httpx_client=_build_http_client())
     )
     log.debug("✅ Supabase admin client (service_role) initialized.")
 
+    # Native async clients - awaited directly from async services, no threadpool hop
+    async_supabase_client = AsyncClient(
+        str(settings.SUPABASE_URL),
+        settings.SUPABASE_ANON_KEY,
+        AsyncClientOptions(httpx_client=_build_async_http_client())
+    )
+    async_supabase_admin_client = AsyncClient(
+        str(settings.SUPABASE_URL),
+        settings.SUPABASE_SERVICE_KEY.get_secret_value(),
+        AsyncClientOptions(httpx_client=_build_async_http_client())
+    )
+    log.debug("✅ Supabase async clients (anon, service_role) initialized.")
+
 except Exception as e:
     # Now the logger is defined and can be used here
     log.error(f"❌ Error initializing Supabase clients: {e}", exc_info=True)
@@ -43,4 +110,16 @@ def get_db_admin() -> Client:
     """Dependency to get the admin (service_role) Supabase client."""
     if supabase_admin_client is None:
         raise RuntimeError("Supabase admin client is not available.")
-    return supabase_admin_client
\ No newline at end of file
+    return supabase_admin_client
+
+def get_async_db() -> AsyncClient:
+    """Dependency to get the async standard (anon) Supabase client."""
+    if async_supabase_client is None:
+        raise RuntimeError("Async Supabase client is not available.")
+    return async_supabase_client
+
+def get_async_db_admin() -> AsyncClient:
+    """Dependency to get the async admin (service_role) Supabase client."""
+    if async_supabase_admin_client is None:
+        raise RuntimeError("Async Supabase admin client is not available.")
+    return async_supabase_admin_client
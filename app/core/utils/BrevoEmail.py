@@ -6,12 +6,19 @@ Workshop reminder emails ke liye simple functions - Only 1day and 15min reminder
 # Main imports jo hamesha chahiye
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, List, Tuple
 import logging
 
 # Global logger
 logger = logging.getLogger(__name__)
 
+# Brevo accepts at most 1000 messageVersions per transactional request
+MAX_MESSAGE_VERSIONS = 1000
+
+# Keep-alive connections to the Brevo API, shared by all sends through the singleton.
+# Sized for the number of reminder batches sent in parallel.
+MAX_PARALLEL_REQUESTS = 10
+
 # Settings - will be imported conditionally
 settings = None
 
@@ -34,6 +41,7 @@ class BrevoEmailService:
             
         configuration = sib_api_v3_sdk.Configuration()
         configuration.api_key['api-key'] = self.api_key
+        configuration.connection_pool_maxsize = MAX_PARALLEL_REQUESTS
         self.api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
             sib_api_v3_sdk.ApiClient(configuration)
         )
@@ -63,14 +71,47 @@ class BrevoEmailService:
             logger.error(f"Email sending failed: {e}")
             return False
 
-    def send_1day_workshop_reminder(self, 
-                                  recipient_email: str,
-                                  recipient_name: str,
-                                  workshop_title: str,
-                                  workshop_date: str,
-                                  workshop_time: str) -> bool:
+    def _send_bulk_email(self,
+                         recipients: List[Tuple[str, str]],
+                         subject: str,
+                         html_content: str,
+                         sender_name: str = "Workshop Team") -> List[str]:
         """
-        1 day pehle workshop reminder
+        Same email to many recipients - ek request mein 1000 tak (messageVersions)
+        html_content can use {{ params.name }} for the recipient's name.
+        Returns the emails Brevo accepted.
+        """
+        accepted = []
+        for start in range(0, len(recipients), MAX_MESSAGE_VERSIONS):
+            batch = recipients[start:start + MAX_MESSAGE_VERSIONS]
+            try:
+                send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+                    subject=subject,
+                    html_content=html_content,
+                    sender={"name": sender_name, "email": self.sender_email},
+                    message_versions=[
+                        {"to": [{"email": email, "name": name}], "params": {"name": name}}
+                        for email, name in batch
+                    ]
+                )
+                
+                self.api_instance.send_transac_email(send_smtp_email)
+                accepted.extend(email for email, _ in batch)
+                logger.info(f"Bulk email sent successfully to {len(batch)} recipients")
+                
+            except Exception as e:
+                # Network/urllib3 errors too: only this chunk failed, earlier ones were accepted
+                logger.error(f"Bulk email sending failed for {len(batch)} recipients: {e}")
+        
+        return accepted
+
+    @staticmethod
+    def _1day_reminder_content(recipient_name: str,
+                               workshop_title: str,
+                               workshop_date: str,
+                               workshop_time: str) -> Tuple[str, str]:
+        """
+        1 day reminder ka subject aur HTML
         """
         subject = f"Tomorrow: {workshop_title} starts!"
         
@@ -95,15 +136,12 @@ class BrevoEmailService:
         </body>
         </html>
         """
-        
-        return self._send_email(recipient_email, recipient_name, subject, html_content)
+        return subject, html_content
 
-    def send_15min_workshop_reminder(self, 
-                                   recipient_email: str,
-                                   recipient_name: str,
-                                   workshop_title: str) -> bool:
+    @staticmethod
+    def _15min_reminder_content(recipient_name: str, workshop_title: str) -> Tuple[str, str]:
         """
-        15 minute pehle workshop reminder
+        15 minute reminder ka subject aur HTML
         """
         subject = f"Starting Soon: {workshop_title}"
         
@@ -122,11 +160,59 @@ class BrevoEmailService:
         </body>
         </html>
         """
+        return subject, html_content
+
+    def send_1day_workshop_reminder(self, 
+                                  recipient_email: str,
+                                  recipient_name: str,
+                                  workshop_title: str,
+                                  workshop_date: str,
+                                  workshop_time: str) -> bool:
+        """
+        1 day pehle workshop reminder
+        """
+        subject, html_content = self._1day_reminder_content(
+            recipient_name, workshop_title, workshop_date, workshop_time
+        )
+        
+        return self._send_email(recipient_email, recipient_name, subject, html_content)
+
+    def send_15min_workshop_reminder(self, 
+                                   recipient_email: str,
+                                   recipient_name: str,
+                                   workshop_title: str) -> bool:
+        """
+        15 minute pehle workshop reminder
+        """
+        subject, html_content = self._15min_reminder_content(recipient_name, workshop_title)
         
         return self._send_email(recipient_email, recipient_name, subject, html_content)
 
+    def send_1day_workshop_reminder_bulk(self,
+                                         recipients: List[Tuple[str, str]],
+                                         workshop_title: str,
+                                         workshop_date: str,
+                                         workshop_time: str) -> List[str]:
+        """
+        1 day reminder ek workshop ke saare (email, name) recipients ko
+        """
+        subject, html_content = self._1day_reminder_content(
+            "{{ params.name }}", workshop_title, workshop_date, workshop_time
+        )
+        return self._send_bulk_email(recipients, subject, html_content)
+
+    def send_15min_workshop_reminder_bulk(self,
+                                          recipients: List[Tuple[str, str]],
+                                          workshop_title: str) -> List[str]:
+        """
+        15 minute reminder ek workshop ke saare (email, name) recipients ko
+        """
+        subject, html_content = self._15min_reminder_content("{{ params.name }}", workshop_title)
+        return self._send_bulk_email(recipients, subject, html_content)
+
 
 # Global instance - will be created when settings are available
+# Singleton hi use karo: iska ApiClient connections reuse karta hai (one TLS handshake per connection)
 brevo_email_service = None
 if settings is not None:
     brevo_email_service = BrevoEmailService()
@@ -1,21 +1,31 @@
 from better_profanity import profanity
+from functools import lru_cache
 from typing import List, Optional
 from app.core.config import settings
 
+# Custom words parsed once; settings.bad_words_list re-splits the env string on every access
+_CUSTOM_BAD_WORDS = tuple(settings.bad_words_list)
+
 # Initialize profanity filter with config-based custom words
 def _initialize_profanity_filter():
     """Initialize the profanity filter with custom words from config"""
     profanity.load_censor_words()
     
     # Only add custom bad words if they exist and content moderation is enabled
-    if (settings.ENABLE_CONTENT_MODERATION and 
-        settings.bad_words_list and 
-        len(settings.bad_words_list) > 0):
-        profanity.add_censor_words(settings.bad_words_list)
+    if settings.ENABLE_CONTENT_MODERATION and _CUSTOM_BAD_WORDS:
+        profanity.add_censor_words(list(_CUSTOM_BAD_WORDS))
 
 # Initialize on module import
 _initialize_profanity_filter()
 
+# Text shorter than the shortest banned word can't contain one; skip the scan for it
+_SHORTEST_BAD_WORD = min((len(str(word)) for word in profanity.CENSOR_WORDSET), default=0)
+
+@lru_cache(maxsize=4096)
+def _contains_profanity(text_lower: str) -> bool:
+    """Memoized profanity scan - form resubmits repeat the same text"""
+    return profanity.contains_profanity(text_lower)
+
 def is_clean(text: str) -> bool:
     """
     Returns True if text does NOT contain profanity (English + Hindi).
@@ -28,7 +38,7 @@ def is_clean(text: str) -> bool:
         return True
     
     # Check for profanity in the text
-    return not profanity.contains_profanity(text.lower())
+    return not _contains_profanity(text.lower())
 
 def censor_text(text: str) -> str:
     """
@@ -58,10 +68,9 @@ def get_violation_words(text: str) -> List[str]:
     text_lower = text.lower()
     
     # Only check against custom words if they exist
-    if settings.bad_words_list and len(settings.bad_words_list) > 0:
-        for word in settings.bad_words_list:
-            if word in text_lower:
-                violations.append(word)
+    for word in _CUSTOM_BAD_WORDS:
+        if word in text_lower:
+            violations.append(word)
     
     return violations
 
@@ -92,7 +101,11 @@ def validate_review_content(text: str, max_length: Optional[int] = None) -> dict
         result["errors"].append(f"Review content exceeds maximum length of {max_length} characters")
     
     # Profanity check (only if content moderation is enabled)
-    if settings.ENABLE_CONTENT_MODERATION and not is_clean(text):
+    if (
+        settings.ENABLE_CONTENT_MODERATION
+        and len(text.strip()) >= _SHORTEST_BAD_WORD
+        and not is_clean(text)
+    ):
         result["is_valid"] = False
         result["errors"].append("Review content contains inappropriate language")
         violations = get_violation_words(text)
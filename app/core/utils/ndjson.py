@@ -0,0 +1,15 @@
+# app/core/utils/ndjson.py
+from typing import Any, Dict
+
+try:
+    import orjson
+
+    def ndjson_line(row: Dict[str, Any]) -> bytes:
+        """One NDJSON line (JSON object + newline) for a streaming response."""
+        return orjson.dumps(row) + b"\n"
+except ImportError:
+    import json
+
+    def ndjson_line(row: Dict[str, Any]) -> bytes:
+        """One NDJSON line (JSON object + newline) for a streaming response."""
+        return json.dumps(row).encode() + b"\n"
@@ -193,7 +193,7 @@ class WorkshopRegistrationDependencies:
             
             # Try to get existing registration
             try:
-                existing_workshops = UserWorkshopService.get_user_workshops(user_id)
+                existing_workshops = await UserWorkshopService.get_user_workshops(user_id)
                 
                 # Check if workshop_id exists in user's workshops
                 for workshop in existing_workshops.workshops:
@@ -1,8 +1,10 @@
 # app/main.py
 
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import JSONResponse, ORJSONResponse
 from .core.config import settings
 from .core.logger import setup_logger
+from .core.db import ORJSON_AVAILABLE
 from .middlewares.cors import setup_cors_middleware
 from .routers import auth, users, workshops, assignments, certificates, reviews, health, user_workshop, leaderboard, notificationRouter
 # from .middlewares.request_logger import RequestLoggerMiddleware # Example import
@@ -17,7 +19,9 @@ app = FastAPI(
     description="🎓 Summer School Backend API for JLUG - Workshop Management System",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson encodes the big list responses (reviews, users) several times faster
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 )
 
 # --- Middleware Setup ---
@@ -64,7 +64,7 @@ async def submit_assignment(
         points_awarded = 0
         if is_first_submission:
             try:
-                points_result = UserService.increment_user_points(current_user.id, 20)
+                points_result = await UserService.increment_user_points(current_user.id, 20)
                 if points_result.success:
                     points_awarded = 20
                     log.info(f"20 points awarded to user {current_user.id} for assignment submission")
@@ -127,7 +127,7 @@ async def grade_assignment(
             try:
                 # Get the assignment to find the user_id
                 assignment = result.data.assignment
-                points_result = UserService.increment_user_points(assignment.user_id, grade_data.marks)
+                points_result = await UserService.increment_user_points(assignment.user_id, grade_data.marks)
                 if points_result.success:
                     points_awarded = grade_data.marks
                     log.info(f"{points_awarded} points awarded to user {assignment.user_id} for assignment grade")
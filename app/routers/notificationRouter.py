@@ -28,6 +28,7 @@ def send_1day_reminders():
             "message": result.get("message", "Processing completed"),
             "count": result.get("count", 0),
             "total_found": result.get("total_found", 0),
+            "error_count": result.get("error_count", 0),
             "errors": result.get("errors", [])
         }
         
@@ -57,6 +58,7 @@ def send_15min_reminders():
             "message": result.get("message", "Processing completed"),
             "count": result.get("count", 0),
             "total_found": result.get("total_found", 0),
+            "error_count": result.get("error_count", 0),
             "errors": result.get("errors", [])
         }
         
@@ -1,7 +1,7 @@
 # app/routers/reviews.py
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.core.logger import setup_logger
-from app.core.db import get_db
+from app.core.db import get_async_db
 from app.services.review import review_service
 from app.schemas.review import (
     ReviewCreate, ReviewUpdate, ReviewOperationResponse, 
@@ -11,8 +11,9 @@ from app.schemas.response import ResponseModel
 from app.dependencies.auth import authenticate_and_create_user, require_admin
 from app.schemas.user import User
 from uuid import UUID
-from supabase import Client
-from typing import Dict
+from supabase import AsyncClient
+from typing import Dict, Optional
+from datetime import datetime
 
 log = setup_logger(__name__)
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
@@ -21,7 +22,7 @@ router = APIRouter(prefix="/reviews", tags=["Reviews"])
 async def create_review(
     review_data: ReviewCreate,
     current_user: User = Depends(authenticate_and_create_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """Create a new review for a workshop"""
     try:
@@ -41,7 +42,7 @@ async def update_review(
     review_id: int,
     review_data: ReviewUpdate,
     current_user: User = Depends(authenticate_and_create_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """Update your own review"""
     try:
@@ -64,7 +65,7 @@ async def update_review(
 async def delete_review(
     review_id: int,
     admin_email: str = Depends(require_admin),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """Delete any review (admin only)"""
     try:
@@ -96,11 +97,13 @@ async def get_workshop_reviews(
     workshop_id: UUID,
     limit: int = Query(20, ge=1, le=100, description="Number of reviews per page"),
     offset: int = Query(0, ge=0, description="Number of reviews to skip"),
-    db: Client = Depends(get_db)
+    cursor: Optional[datetime] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
+    cursor_id: Optional[int] = Query(None, description="next_cursor_id from the previous page"),
+    db: AsyncClient = Depends(get_async_db)
 ):
     """Get all reviews for a workshop (public access)"""
     try:
-        result = await review_service.get_reviews_by_workshop(workshop_id, limit, offset, db)
+        result = await review_service.get_reviews_by_workshop(workshop_id, limit, offset, db, cursor=cursor, cursor_id=cursor_id)
         if not result.success:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result.message)
         
@@ -114,7 +117,7 @@ async def get_workshop_reviews(
 @router.get("/workshops/{workshop_id}/stats", response_model=ResponseModel[Dict])
 async def get_workshop_rating_stats(
     workshop_id: UUID,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """Get rating statistics for a workshop"""
     try:
@@ -134,11 +137,13 @@ async def get_my_reviews(
     current_user: User = Depends(authenticate_and_create_user),
     limit: int = Query(20, ge=1, le=100, description="Number of reviews per page"),
     offset: int = Query(0, ge=0, description="Number of reviews to skip"),
-    db: Client = Depends(get_db)
+    cursor: Optional[datetime] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
+    cursor_id: Optional[int] = Query(None, description="next_cursor_id from the previous page"),
+    db: AsyncClient = Depends(get_async_db)
 ):
     """Get your own reviews"""
     try:
-        result = await review_service.get_reviews_by_user(current_user.id, limit, offset, db)
+        result = await review_service.get_reviews_by_user(current_user.id, limit, offset, db, cursor=cursor, cursor_id=cursor_id)
         if not result.success:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result.message)
         
@@ -155,11 +160,13 @@ async def get_user_reviews(
     admin_email: str = Depends(require_admin),
     limit: int = Query(20, ge=1, le=100, description="Number of reviews per page"),
     offset: int = Query(0, ge=0, description="Number of reviews to skip"),
-    db: Client = Depends(get_db)
+    cursor: Optional[datetime] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
+    cursor_id: Optional[int] = Query(None, description="next_cursor_id from the previous page"),
+    db: AsyncClient = Depends(get_async_db)
 ):
     """Get reviews by specific user (admin only)"""
     try:
-        result = await review_service.get_reviews_by_user(user_id, limit, offset, db)
+        result = await review_service.get_reviews_by_user(user_id, limit, offset, db, cursor=cursor, cursor_id=cursor_id)
         if not result.success:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result.message)
         
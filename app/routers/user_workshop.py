@@ -1,5 +1,6 @@
 # app/routers/user_workshop.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 from uuid import UUID
 from typing import List
 
@@ -43,23 +44,6 @@ async def register_registered_user_to_workshop(
     try:
         log.info(f"Registered user {current_user.email} attempting to register for workshop {registration_data.workshop_id}")
         
-        # Check for duplicate registration by trying to get user workshops
-        try:
-            user_workshops = UserWorkshopService.get_user_workshops(current_user.id)
-            for workshop in user_workshops.workshops:
-                if workshop.workshop_id == registration_data.workshop_id:
-                    log.warning(f"Duplicate registration attempt: user {current_user.id}, workshop {registration_data.workshop_id}")
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="You are already registered for this workshop"
-                    )
-        except HTTPException as e:
-            if e.status_code != status.HTTP_500_INTERNAL_SERVER_ERROR:
-                # If it's not a server error, user might have no workshops yet - continue
-                pass
-            else:
-                raise e
-        
         # Register user to workshop
         from app.schemas.user_workshop import RegisterUserToWorkshopSchema
         registration_payload = RegisterUserToWorkshopSchema(
@@ -67,7 +51,7 @@ async def register_registered_user_to_workshop(
             workshop_id=registration_data.workshop_id
         )
         
-        result = UserWorkshopService.register_user_to_workshop(registration_payload)
+        result = await UserWorkshopService.register_user_to_workshop(registration_payload)
         
         # Auto-create assignment for enrolled workshop
         assignment_created = await AssignmentService.create_assignment_on_enroll(
@@ -121,23 +105,6 @@ async def register_guest_to_workshop(
     try:
         log.info(f"Guest user {registration_data.email} attempting to register for workshop {registration_data.workshop_id}")
         
-        # Check for duplicate registration by trying to get user workshops
-        try:
-            user_workshops = UserWorkshopService.get_user_workshops(guest_user.id)
-            for workshop in user_workshops.workshops:
-                if workshop.workshop_id == registration_data.workshop_id:
-                    log.warning(f"Duplicate registration attempt: guest {guest_user.id}, workshop {registration_data.workshop_id}")
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email is already registered for this workshop"
-                    )
-        except HTTPException as e:
-            if e.status_code != status.HTTP_500_INTERNAL_SERVER_ERROR:
-                # If it's not a server error, user might have no workshops yet - continue
-                pass
-            else:
-                raise e
-        
         # Register guest to workshop
         from app.schemas.user_workshop import RegisterUserToWorkshopSchema
         registration_payload = RegisterUserToWorkshopSchema(
@@ -145,7 +112,7 @@ async def register_guest_to_workshop(
             workshop_id=registration_data.workshop_id
         )
         
-        result = UserWorkshopService.register_user_to_workshop(registration_payload)
+        result = await UserWorkshopService.register_user_to_workshop(registration_payload)
         
         # Auto-create assignment for enrolled workshop
         assignment_created = await AssignmentService.create_assignment_on_enroll(
@@ -185,7 +152,7 @@ async def register_guest_to_workshop(
 
 # � Route 3: Get Workshop Participants (Admin Only)
 @router.get("/workshop/{workshop_id}/participants", response_model=ResponseModel[FetchWorkshopUsersResponse])
-def get_workshop_participants(
+async def get_workshop_participants(
     workshop_id: UUID,
     _: str = Depends(require_admin)
 ):
@@ -197,14 +164,16 @@ def get_workshop_participants(
     try:
         log.debug(f"Admin fetching participants for workshop: {workshop_id}")
         
-        participants = UserWorkshopService.get_workshop_users(workshop_id)
+        participants = await UserWorkshopService.get_workshop_users(workshop_id)
         
         log.info(f"Retrieved {participants.total_participants} participants for workshop {workshop_id}")
         
-        return ResponseModel(
+        # Serialize in one pydantic-core pass; FastAPI passes a Response through untouched
+        payload = ResponseModel[FetchWorkshopUsersResponse](
             message=f"Found {participants.total_participants} participants",
             data=participants
         )
+        return Response(content=payload.model_dump_json(), media_type="application/json")
         
     except HTTPException:
         raise
@@ -216,9 +185,27 @@ def get_workshop_participants(
         )
 
 
+# 📤 Route 3b: Stream Workshop Participants as NDJSON (Admin Only)
+@router.get("/workshop/{workshop_id}/participants/stream")
+async def stream_workshop_participants(
+    workshop_id: UUID,
+    _: str = Depends(require_admin)
+):
+    """
+    Stream a workshop's participants one JSON object per line
+    - Admin access required
+    - For large workshops: memory stays flat and the first rows arrive immediately
+    """
+    log.debug(f"Admin streaming participants for workshop: {workshop_id}")
+    return StreamingResponse(
+        UserWorkshopService.stream_workshop_users_ndjson(workshop_id),
+        media_type="application/x-ndjson"
+    )
+
+
 # 👤 Route 4: Get User's Registered Workshops
 @router.get("/user/workshops", response_model=ResponseModel[FetchUsersWorkshopsResponse])
-def get_user_workshops(
+async def get_user_workshops(
     current_user: User = Depends(get_current_registered_user)
 ):
     """
@@ -229,14 +216,16 @@ def get_user_workshops(
     try:
         log.debug(f"Fetching workshops for user: {current_user.email}")
         
-        user_workshops = UserWorkshopService.get_user_workshops(current_user.id)
+        user_workshops = await UserWorkshopService.get_user_workshops(current_user.id)
         
         log.info(f"Retrieved {user_workshops.total_workshops} workshops for user {current_user.email}")
         
-        return ResponseModel(
+        # Serialize in one pydantic-core pass; FastAPI passes a Response through untouched
+        payload = ResponseModel[FetchUsersWorkshopsResponse](
             message=f"Found {user_workshops.total_workshops} registered workshops",
             data=user_workshops
         )
+        return Response(content=payload.model_dump_json(), media_type="application/json")
         
     except HTTPException:
         raise
@@ -250,7 +239,7 @@ def get_user_workshops(
 
 # 🔄 Route 5: Update Reminder Status (Admin Only)
 @router.patch("/reminder-status", response_model=ResponseModel[UserWorkshopRelation])
-def update_reminder_status(
+async def update_reminder_status(
     reminder_data: UpdateReminderStatusSchema,
     _: str = Depends(require_admin)
 ):
@@ -262,7 +251,7 @@ def update_reminder_status(
     try:
         log.debug(f"Admin updating reminder status for user {reminder_data.user_id}, workshop {reminder_data.workshop_id}")
         
-        updated_relation = UserWorkshopService.update_reminder_status(reminder_data)
+        updated_relation = await UserWorkshopService.update_reminder_status(reminder_data)
         
         log.info(f"Reminder status updated for user {reminder_data.user_id}, workshop {reminder_data.workshop_id}")
         
@@ -281,9 +270,40 @@ def update_reminder_status(
         )
 
 
+# 🔄 Route 5b: Bulk Update Reminder Status (Admin Only)
+@router.patch("/reminder-status/bulk", response_model=ResponseModel[List[UserWorkshopRelation]])
+async def bulk_update_reminder_status(
+    reminder_data: List[UpdateReminderStatusSchema],
+    _: str = Depends(require_admin)
+):
+    """
+    Update reminder status for many user-workshop registrations at once
+    - Admin access required
+    - Registrations that don't exist are skipped
+    """
+    try:
+        log.debug(f"Admin bulk updating reminder status for {len(reminder_data)} registrations")
+        
+        updated_relations = await UserWorkshopService.bulk_update_reminder_status(reminder_data)
+        
+        return ResponseModel(
+            message=f"Reminder status updated for {len(updated_relations)} registrations",
+            data=updated_relations
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception(f"Error bulk updating reminder status")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update reminder status"
+        )
+
+
 # 🗑️ Route 6: Unregister from Workshop
 @router.delete("/unregister/{workshop_id}", response_model=ResponseModel[dict])
-def unregister_from_workshop(
+async def unregister_from_workshop(
     workshop_id: UUID,
     current_user: User = Depends(get_current_registered_user)
 ):
@@ -295,7 +315,7 @@ def unregister_from_workshop(
     try:
         log.info(f"User {current_user.email} attempting to unregister from workshop {workshop_id}")
         
-        success = UserWorkshopService.unregister_user_from_workshop(current_user.id, workshop_id)
+        success = await UserWorkshopService.unregister_user_from_workshop(current_user.id, workshop_id)
         
         if success:
             log.info(f"User {current_user.email} successfully unregistered from workshop {workshop_id}")
@@ -1,5 +1,5 @@
 # app/routers/workshops.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from app.services.workshop import WorkshopService
 from app.schemas.response import ResponseModel
 from app.schemas.workshop import (
@@ -11,8 +11,9 @@ from app.schemas.workshop import (
 )
 from app.dependencies.auth import require_admin, verify_valid_token
 from app.core.logger import setup_logger
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from uuid import UUID
+from datetime import datetime
 
 router = APIRouter(prefix="/workshops", tags=["Workshops"])
 log = setup_logger(__name__)
@@ -34,7 +35,7 @@ async def create_workshop(
     """
     try:
         log.info(f"Admin creating workshop: {payload.title}")
-        workshop = WorkshopService.create_workshop(payload)  # Sync call, no await
+        workshop = await WorkshopService.create_workshop(payload)
         return ResponseModel(
             message="Workshop created successfully", 
             data=workshop
@@ -46,6 +47,34 @@ async def create_workshop(
             detail=f"Failed to create workshop: {str(e)}"
         )
 
+# 🔹 1b. Create Workshops in Bulk (Admin only)
+@router.post("/bulk", response_model=ResponseModel[List[WorkshopOut]])
+async def create_workshops_bulk(
+    payload: List[WorkshopCreate],
+    user: dict = Depends(require_admin)
+):
+    """
+    Create several workshops at once (Admin only)
+    
+    Same fields as single create; all rows are inserted in one transaction,
+    so either every workshop is created or none is.
+    """
+    try:
+        log.info(f"Admin creating {len(payload)} workshops")
+        workshops = await WorkshopService.create_workshops_bulk(payload)
+        return ResponseModel(
+            message=f"{len(workshops)} workshops created successfully",
+            data=workshops
+        )
+    except HTTPException:
+        raise  # Re-raise HTTP exceptions from service
+    except Exception as e:
+        log.error(f"Failed to create workshops: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create workshops: {str(e)}"
+        )
+
 # 🔹 2. Get Workshop Statistics (Put BEFORE /{workshop_id})
 @router.get("/stats", response_model=ResponseModel[WorkshopStats])
 async def get_workshop_stats():
@@ -60,7 +89,7 @@ async def get_workshop_stats():
     - Next upcoming workshop
     """
     try:
-        stats = WorkshopService.get_workshop_stats()  # Sync call
+        stats = await WorkshopService.get_workshop_stats()
         return ResponseModel(
             message="Workshop statistics fetched successfully", 
             data=stats
@@ -79,7 +108,7 @@ async def get_upcoming_workshops(
 ):
     """Get upcoming workshops ordered by date"""
     try:
-        workshops = WorkshopService.get_upcoming_workshops(limit=limit)
+        workshops = await WorkshopService.get_upcoming_workshops(limit=limit)
         return ResponseModel(
             message=f"Fetched {len(workshops)} upcoming workshops", 
             data=workshops
@@ -99,7 +128,7 @@ async def search_by_technology(
 ):
     """Search workshops by specific technology"""
     try:
-        workshops = WorkshopService.search_workshops_by_technology(tech_name)
+        workshops = await WorkshopService.search_workshops_by_technology(tech_name)
         return ResponseModel(
             message=f"Found {len(workshops)} workshops for technology: {tech_name}", 
             data=workshops
@@ -117,8 +146,11 @@ async def get_all_workshops(
     search: str = Query(None, description="Search in title and description"),
     technology: str = Query(None, description="Filter by technology"),
     instructor: str = Query(None, description="Filter by instructor name"),
+    instructor_exact: bool = Query(False, description="Match instructor name exactly"),
     page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(20, ge=1, le=100, description="Items per page")
+    page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    after_scheduled_at: Optional[datetime] = Query(None, description="Cursor from pagination.next_cursor"),
+    after_id: Optional[UUID] = Query(None, description="Cursor from pagination.next_cursor")
 ):
     """
     Get all workshops with advanced filtering and pagination
@@ -127,23 +159,36 @@ async def get_all_workshops(
     - search: Search text in title/description
     - technology: Filter by specific technology
     - instructor: Filter by instructor name
+    - instructor_exact: Match the instructor name exactly (default: substring)
     - page: Page number (default: 1)
     - page_size: Items per page (default: 20, max: 100)
+    - after_scheduled_at + after_id: continue after pagination.next_cursor instead of
+      using page (constant cost however deep you go; total/total_pages are null)
     """
+    if (after_scheduled_at is None) != (after_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="after_scheduled_at and after_id must be given together"
+        )
     try:
         filters = WorkshopFilters(
             search=search,
             technology=technology,
             instructor=instructor,
+            instructor_exact=instructor_exact,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            after_scheduled_at=after_scheduled_at,
+            after_id=after_id
         )
         
-        result = WorkshopService.list_workshops(filters)
-        return ResponseModel(
+        result = await WorkshopService.list_workshops(filters)
+        # Serialize in one pydantic-core pass; FastAPI passes a Response through untouched
+        payload = ResponseModel[Dict[str, Any]](
             message=f"Fetched {len(result['workshops'])} workshops", 
             data=result
         )
+        return Response(content=payload.model_dump_json(), media_type="application/json")
     except Exception as e:
         log.error(f"Failed to get workshops: {str(e)}")
         raise HTTPException(
@@ -165,7 +210,7 @@ async def get_workshop_by_id(
     - IST formatted dates
     """
     try:
-        workshop = WorkshopService.get_workshop_by_id(workshop_id)
+        workshop = await WorkshopService.get_workshop_by_id(workshop_id)
         return ResponseModel(
             message="Workshop details fetched successfully", 
             data=workshop
@@ -199,7 +244,7 @@ async def update_workshop(
     """
     try:
         log.debug(f"Admin updating workshop: {workshop_id}")
-        workshop = WorkshopService.update_workshop(workshop_id, payload)
+        workshop = await WorkshopService.update_workshop(workshop_id, payload)
         return ResponseModel(
             message="Workshop updated successfully", 
             data=workshop
@@ -227,7 +272,7 @@ async def delete_workshop(
     """
     try:
         log.info(f"Admin deleting workshop: {workshop_id}")
-        result = WorkshopService.delete_workshop(workshop_id)
+        result = await WorkshopService.delete_workshop(workshop_id)
         return ResponseModel(
             message="Workshop deleted successfully", 
             data=result
@@ -62,6 +62,8 @@ class ReviewListResponse(BaseModel):
     total_count: int
     workshop_id: Optional[UUID] = None
     average_rating: Optional[float] = None
+    next_cursor: Optional[datetime] = None  # pass back as ?cursor= for the next page
+    next_cursor_id: Optional[int] = None  # ...together with ?cursor_id=
 
 
 class WorkshopReviewSummary(BaseModel):
@@ -164,12 +164,16 @@ class WorkshopFilters(BaseModel):
     search: Optional[str] = Field(None, description="Search in title and description")
     technology: Optional[str] = Field(None, description="Filter by specific technology")
     instructor: Optional[str] = Field(None, description="Filter by instructor name")
+    instructor_exact: bool = Field(False, description="Match the instructor name exactly instead of as a substring")
     from_date: Optional[datetime] = Field(None, description="Filter workshops from this date (IST)")
     to_date: Optional[datetime] = Field(None, description="Filter workshops until this date (IST)")
     page: int = Field(default=1, ge=1, description="Page number")
     page_size: int = Field(default=20, ge=1, le=100, description="Items per page")
+    # Keyset cursor (both or neither): continue after this (scheduled_at, id); replaces page
+    after_scheduled_at: Optional[datetime] = Field(None, description="Cursor: scheduled_at of the last workshop seen")
+    after_id: Optional[UUID] = Field(None, description="Cursor: id of the last workshop seen")
     
-    @field_validator('from_date', 'to_date')
+    @field_validator('from_date', 'to_date', 'after_scheduled_at')
     @classmethod
     def convert_to_ist(cls, v: Optional[datetime]) -> Optional[datetime]:
         """Convert filter dates to IST"""
@@ -3,15 +3,17 @@ Notification Service for Workshop Email Reminders
 Simplified service for workshop email notifications with IST timezone support
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 from fastapi import HTTPException, status
 import logging
 
 from app.core.db import get_db, get_db_admin
-from app.core.utils.BrevoEmail import brevo_email_service
+from app.core.utils.BrevoEmail import brevo_email_service, MAX_PARALLEL_REQUESTS
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +21,166 @@ logger = logging.getLogger(__name__)
 IST = ZoneInfo("Asia/Kolkata")
 
 
+@lru_cache(maxsize=4096)
+def _parse_ist(value: str) -> datetime:
+    """
+    Parse a scheduled_at string from Supabase into an IST datetime.
+    Cached because the same workshop timestamps are parsed on every run.
+    """
+    parsed = datetime.fromisoformat(value)  # handles a trailing "Z" on Python 3.11+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=IST)
+    return parsed.astimezone(IST)
+
+
+# Workshop batches sent to Brevo in parallel (one pooled connection each)
+MAX_CONCURRENT_SENDS = MAX_PARALLEL_REQUESTS
+
+# Only the first few error messages are returned; the full outcome goes to reminder_log
+MAX_REPORTED_ERRORS = 20
+
+
 class NotificationService:
+    @staticmethod
+    def _write_reminder_log(rows: List[Dict[str, Any]]) -> None:
+        """
+        Persist per-recipient outcomes with a single batched insert.
+        reminder_log has RLS with no policies, so this goes through the service-role client.
+        Logging failures never fail the reminder run itself.
+        """
+        if not rows:
+            return
+        try:
+            get_db_admin().table("reminder_log").insert(rows).execute()
+        except Exception as e:
+            logger.error("Error writing reminder_log (%d rows): %s", len(rows), e)
+    
+    @staticmethod
+    def _log_row(enrollment: Dict[str, Any], kind: str, error: Optional[str]) -> Dict[str, Any]:
+        """Build one reminder_log row for a send attempt."""
+        return {
+            "user_id": enrollment.get("user_id"),
+            "workshop_id": enrollment.get("workshop_id"),
+            "kind": kind,
+            "status": "failed" if error else "sent",
+            "message": error,
+        }
+    
+    @staticmethod
+    def send_workshop_reminders(
+        workshop: Dict[str, Any],
+        start_time: datetime,
+        recipients: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        kind: str
+    ) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        Send one reminder kind to every (enrollment, user) of a single workshop
+        using Brevo bulk requests. Marking them as sent is left to the caller.
+        Self-contained unit of work so the fan-out can be handed to a worker pool.
+        Returns (enrollment, error) per recipient; error is None on success.
+        """
+        label = "1-day" if kind == "1day" else "15-min"
+        title = workshop.get("title", "")
+        outcomes = []
+        addresses = []
+        enrollments = []
+        
+        # Unpack each row once; addresses and enrollments stay index-aligned
+        for enrollment, user in recipients:
+            email = user.get("email")
+            if not email:
+                outcomes.append((enrollment, f"No email found for user {enrollment['user_id']}"))
+                continue
+            # Fixed: Use 'name' column as per schema
+            addresses.append((email, user.get("name") or ""))
+            enrollments.append(enrollment)
+        
+        if not addresses:
+            return outcomes
+        
+        try:
+            if kind == "1day":
+                accepted = brevo_email_service.send_1day_workshop_reminder_bulk(
+                    addresses,
+                    workshop_title=title,
+                    workshop_date=start_time.strftime("%B %d, %Y"),  # "August 08, 2025"
+                    workshop_time=start_time.strftime("%I:%M %p IST")  # "02:30 PM IST"
+                )
+            else:
+                accepted = brevo_email_service.send_15min_workshop_reminder_bulk(
+                    addresses,
+                    workshop_title=title
+                )
+            accepted = set(accepted)
+            
+            for (email, _), enrollment in zip(addresses, enrollments):
+                outcomes.append((enrollment, None if email in accepted else f"Failed to send email to {email}"))
+            
+            logger.debug("%s reminder sent to %d recipients for workshop %s", label, len(accepted), title)
+            
+        except Exception as e:
+            logger.error("Error sending %s reminders for workshop %s: %s", label, title, e)
+            error_msg = f"Error sending {label} reminder: {str(e)}"
+            outcomes.extend((enrollment, error_msg) for enrollment in enrollments)
+        
+        return outcomes
+    
+    @staticmethod
+    def _send_in_batches(db, kind: str, workshops_to_process: List[Dict[str, Any]]) -> Tuple[int, int, List[str]]:
+        """
+        Group pending items by workshop, send the groups concurrently, then mark
+        every delivered reminder with a single RPC and record outcomes.
+        Returns (success_count, error_count, errors).
+        """
+        batches: Dict[Any, Dict[str, Any]] = {}
+        for item in workshops_to_process:
+            batch = batches.setdefault(item["workshop"]["id"], {
+                "workshop": item["workshop"],
+                "start_time": item["start_time"],
+                "recipients": []
+            })
+            batch["recipients"].append((item["enrollment"], item["user"]))
+        
+        # Brevo calls are blocking HTTP requests; overlap them across workshops
+        outcomes = []
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_SENDS, len(batches))) as pool:
+            futures = [
+                pool.submit(
+                    NotificationService.send_workshop_reminders,
+                    batch["workshop"], batch["start_time"], batch["recipients"], kind
+                )
+                for batch in batches.values()
+            ]
+            for future in futures:
+                outcomes.extend(future.result())
+        
+        sent_ids = [enrollment["id"] for enrollment, error in outcomes if error is None]
+        if sent_ids:
+            try:
+                db.rpc("mark_reminders_sent", {"ids": sent_ids, "which": kind}).execute()
+            except Exception as e:
+                # Emails went out but the flags did not stick; report them as failed
+                logger.error("Error marking %d %s reminders as sent: %s", len(sent_ids), kind, e)
+                error_msg = f"Error updating reminder status: {str(e)}"
+                outcomes = [(enrollment, error or error_msg) for enrollment, error in outcomes]
+        
+        success_count = 0
+        error_count = 0
+        errors = []
+        log_rows = []
+        
+        for enrollment, error in outcomes:
+            log_rows.append(NotificationService._log_row(enrollment, kind, error))
+            if error:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(error)
+            else:
+                success_count += 1
+        
+        NotificationService._write_reminder_log(log_rows)
+        return success_count, error_count, errors
+    
     @staticmethod
     def send_1day_reminders() -> Dict[str, Any]:
         """
@@ -30,113 +191,52 @@ class NotificationService:
             now_ist = datetime.now(IST)
             next_24_hours = now_ist + timedelta(hours=24)
             
-            logger.info(f"Checking for workshops starting within next 24 hours from {now_ist} to {next_24_hours} (IST)")
+            logger.info("Checking for workshops starting within next 24 hours from %s to %s (IST)", now_ist, next_24_hours)
             
             db = get_db()
             
-            # Get user enrollments that need 1-day reminders
-            response = db.table("user_workshop").select("*").is_("reminder_1day_sent", False).execute()
-            
-            if not response.data:
-                logger.info("No workshops found for 1-day reminders")
-                return {"status": "success", "message": "No workshops found for 1-day reminders", "count": 0}
-            
-            # Get workshops data
-            workshops_response = db.table("workshops").select("id, title, scheduled_at").execute()
-            workshops_dict = {w["id"]: w for w in workshops_response.data} if workshops_response.data else {}
-            
-            # Get users data with correct schema - only 'name' column exists
-            users_response = db.table("users").select("id, name, email").execute()
-            users_dict = {u["id"]: u for u in users_response.data} if users_response.data else {}
-            
-            success_count = 0
-            errors = []
-            workshops_to_process = []
+            # Pending enrollments joined with their workshop and user; the 24-hour
+            # window is applied by PostgREST so only qualifying rows come back.
+            # Bounds are sent in UTC, the same form Postgres stores and returns.
+            response = (
+                db.table("user_workshop")
+                .select("id, user_id, workshop_id, workshops!inner(id, title, scheduled_at), users!inner(id, name, email)")
+                .eq("reminder_1day_sent", False)
+                .gt("workshops.scheduled_at", now_ist.astimezone(timezone.utc).isoformat())
+                .lte("workshops.scheduled_at", next_24_hours.astimezone(timezone.utc).isoformat())
+                .execute()
+            )
             
-            # Filter workshops starting tomorrow
-            for enrollment in response.data:
-                workshop_id = enrollment.get("workshop_id")
-                workshop = workshops_dict.get(workshop_id)
-                
-                if workshop and workshop.get("scheduled_at"):
-                    # Parse workshop start time and convert to IST
-                    start_time_str = workshop["scheduled_at"]
-                    if start_time_str.endswith("Z"):
-                        start_time_str = start_time_str.replace("Z", "+00:00")
-                    
-                    start_time = datetime.fromisoformat(start_time_str)
-                    if start_time.tzinfo is None:
-                        start_time = start_time.replace(tzinfo=IST)
-                    else:
-                        start_time = start_time.astimezone(IST)
-                    
-                    # Check if workshop is starting within next 24 hours (flexible window)
-                    # Send 1-day reminder only if workshop is within next 24 hours
-                    time_until_workshop = start_time - now_ist
-                    hours_until_workshop = time_until_workshop.total_seconds() / 3600
-                    
-                    # Send reminder only if workshop is within next 24 hours (1 day)
-                    if 0 < hours_until_workshop <= 24:
-                        workshops_to_process.append({
-                            "enrollment": enrollment,
-                            "workshop": workshop,
-                            "start_time": start_time
-                        })
+            workshops_to_process = [
+                {
+                    "enrollment": {"id": row["id"], "user_id": row["user_id"], "workshop_id": row["workshop_id"]},
+                    "workshop": row["workshops"],
+                    "user": row["users"],
+                    "start_time": _parse_ist(row["workshops"]["scheduled_at"])
+                }
+                for row in response.data or []
+            ]
             
             if not workshops_to_process:
                 logger.info("No workshops starting within next 24 hours found for 1-day reminders")
                 return {"status": "success", "message": "No workshops starting within next 24 hours found", "count": 0}
             
-            # Send emails and update status
-            for item in workshops_to_process:
-                enrollment = item["enrollment"]
-                workshop = item["workshop"]
-                start_time = item["start_time"]
-                
-                try:
-                    user_id = enrollment.get("user_id")
-                    user = users_dict.get(user_id, {})
-                    
-                    # Fixed: Use 'name' column as per schema
-                    name = user.get("name", "")
-                    email = user.get("email", "")
-                    title = workshop.get("title", "")
-                    
-                    if not email:
-                        errors.append(f"No email found for user {user_id}")
-                        continue
-                    
-                    # Send email with correct BrevoEmail method signature
-                    email_sent = brevo_email_service.send_1day_workshop_reminder(
-                        recipient_email=email,
-                        recipient_name=name,
-                        workshop_title=title,
-                        workshop_date=start_time.strftime("%B %d, %Y"),  # "August 08, 2025"
-                        workshop_time=start_time.strftime("%I:%M %p IST")  # "02:30 PM IST"
-                    )
-                    
-                    if email_sent:
-                        # Update reminder status using Supabase
-                        db.table("user_workshop").update({
-                            "reminder_1day_sent": True
-                        }).eq("user_id", enrollment["user_id"]).eq("workshop_id", enrollment["workshop_id"]).execute()
-                        
-                        success_count += 1
-                        logger.info(f"1-day reminder sent to {email} for workshop {title}")
-                    else:
-                        errors.append(f"Failed to send email to {email}")
-                        
-                except Exception as e:
-                    error_msg = f"Error sending 1-day reminder: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-                    continue
+            # Send emails and update status, one batch per workshop
+            success_count, error_count, errors = NotificationService._send_in_batches(
+                db, "1day", workshops_to_process
+            )
+            
+            logger.info(
+                "1-day reminders processed: %d sent, %d failed, %d found",
+                success_count, error_count, len(workshops_to_process)
+            )
             
             return {
                 "status": "success", 
                 "message": f"1-day reminders processed",
                 "count": success_count,
                 "total_found": len(workshops_to_process),
+                "error_count": error_count,
                 "errors": errors
             }
             
@@ -153,115 +253,42 @@ class NotificationService:
         Send 15-minute reminder emails for workshops starting in 15 minutes
         """
         try:
-            # Calculate time window for 15-minute reminders (next 15 minutes)
-            now_ist = datetime.now(IST)
-            next_15_minutes = now_ist + timedelta(minutes=15)
-            
-            logger.info(f"Checking for workshops starting within next 15 minutes from {now_ist} to {next_15_minutes} (IST)")
-            
             db = get_db()
             
-            # Get user enrollments that need 15-min reminders
-            response = db.table("user_workshop").select("*").is_("reminder_15min_sent", False).execute()
+            # The window (now, now + 15 min] is evaluated in Postgres against an index
+            # on workshops.scheduled_at; only unsent enrollments in it are returned
+            response = db.rpc("pending_15min_reminders").execute()
             
             if not response.data:
-                logger.info("No workshops found for 15-minute reminders")
-                return {"status": "success", "message": "No workshops found for 15-minute reminders", "count": 0}
-            
-            # Get workshops data
-            workshops_response = db.table("workshops").select("id, title, scheduled_at").execute()
-            workshops_dict = {w["id"]: w for w in workshops_response.data} if workshops_response.data else {}
-            
-            # Get users data with correct schema - only 'name' column exists
-            users_response = db.table("users").select("id, name, email").execute()
-            users_dict = {u["id"]: u for u in users_response.data} if users_response.data else {}
-            
-            success_count = 0
-            errors = []
-            workshops_to_process = []
-            
-            # Filter workshops starting in 15 minutes
-            for enrollment in response.data:
-                workshop_id = enrollment.get("workshop_id")
-                workshop = workshops_dict.get(workshop_id)
-                
-                if workshop and workshop.get("scheduled_at"):
-                    # Parse workshop start time and convert to IST
-                    start_time_str = workshop["scheduled_at"]
-                    if start_time_str.endswith("Z"):
-                        start_time_str = start_time_str.replace("Z", "+00:00")
-                    
-                    workshop_start = datetime.fromisoformat(start_time_str)
-                    if workshop_start.tzinfo is None:
-                        workshop_start = workshop_start.replace(tzinfo=IST)
-                    else:
-                        workshop_start = workshop_start.astimezone(IST)
-                    
-                    # Check if workshop is starting within next 15 minutes (flexible window)
-                    # Send 15-min reminder only if workshop is within next 15 minutes
-                    time_until_workshop = workshop_start - now_ist
-                    minutes_until_workshop = time_until_workshop.total_seconds() / 60
-                    
-                    # Send reminder only if workshop is within next 15 minutes
-                    if 0 < minutes_until_workshop <= 15:
-                        workshops_to_process.append({
-                            "enrollment": enrollment,
-                            "workshop": workshop,
-                            "start_time": workshop_start
-                        })
-            
-            if not workshops_to_process:
                 logger.info("No workshops starting within next 15 minutes found")
                 return {"status": "success", "message": "No workshops starting within next 15 minutes", "count": 0}
             
-            # Send emails and update status
-            for item in workshops_to_process:
-                enrollment = item["enrollment"]
-                workshop = item["workshop"]
-                start_time = item["start_time"]
-                
-                try:
-                    user_id = enrollment.get("user_id")
-                    user = users_dict.get(user_id, {})
-                    
-                    # Fixed: Use 'name' column as per schema
-                    name = user.get("name", "")
-                    email = user.get("email", "")
-                    title = workshop.get("title", "")
-                    
-                    if not email:
-                        errors.append(f"No email found for user {user_id}")
-                        continue
-                    
-                    # Send email with correct BrevoEmail method signature
-                    email_sent = brevo_email_service.send_15min_workshop_reminder(
-                        recipient_email=email,
-                        recipient_name=name,
-                        workshop_title=title
-                    )
-                    
-                    if email_sent:
-                        # Update reminder status using Supabase
-                        db.table("user_workshop").update({
-                            "reminder_15min_sent": True
-                        }).eq("user_id", enrollment["user_id"]).eq("workshop_id", enrollment["workshop_id"]).execute()
-                        
-                        success_count += 1
-                        logger.info(f"15-min reminder sent to {email} for workshop {title}")
-                    else:
-                        errors.append(f"Failed to send email to {email}")
-                        
-                except Exception as e:
-                    error_msg = f"Error sending 15-min reminder: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-                    continue
+            workshops_to_process = [
+                {
+                    "enrollment": {"id": row["id"], "user_id": row["user_id"], "workshop_id": row["workshop_id"]},
+                    "workshop": {"id": row["workshop_id"], "title": row["title"]},
+                    "user": {"name": row["name"] or "", "email": row["email"]},
+                    "start_time": _parse_ist(row["scheduled_at"])
+                }
+                for row in response.data
+            ]
+            
+            # Send emails and update status, one batch per workshop
+            success_count, error_count, errors = NotificationService._send_in_batches(
+                db, "15min", workshops_to_process
+            )
+            
+            logger.info(
+                "15-min reminders processed: %d sent, %d failed, %d found",
+                success_count, error_count, len(workshops_to_process)
+            )
             
             return {
                 "status": "success", 
                 "message": f"15-minute reminders processed",
                 "count": success_count,
                 "total_found": len(workshops_to_process),
+                "error_count": error_count,
                 "errors": errors
             }
             
@@ -329,73 +356,21 @@ class NotificationService:
     @staticmethod
     def get_notification_stats() -> Dict[str, Any]:
         """
-        Get statistics about notifications using simple approach
+        Get statistics about notifications for upcoming workshops
         """
         try:
             now_ist = datetime.now(IST)
             db = get_db()
             
-            # First get all user_workshop records
-            response = db.table("user_workshop").select("*").execute()
-            
-            if not response.data:
-                logger.warning("No enrollment data found")
-                return {
-                    "status": "success",
-                    "timestamp_ist": now_ist.strftime("%Y-%m-%d %I:%M %p IST"),
-                    "stats": {
-                        "total_active_enrollments": 0,
-                        "reminders_sent": {"1_day": 0, "15_minute": 0},
-                        "reminders_pending": {"1_day": 0, "15_minute": 0}
-                    }
-                }
-            
-            # Get all workshops to check dates
-            workshops_response = db.table("workshops").select("id, scheduled_at").execute()
-            workshops_dict = {w["id"]: w for w in workshops_response.data} if workshops_response.data else {}
-            
-            # Calculate stats
-            sent_1day = 0
-            sent_15min = 0
-            pending_1day = 0
-            pending_15min = 0
-            total_active = 0
+            # Counting happens in Postgres; a single row comes back
+            response = db.rpc("get_reminder_stats").execute()
+            row = response.data[0] if response.data else {}
             
-            for enrollment in response.data:
-                workshop_id = enrollment.get("workshop_id")
-                workshop = workshops_dict.get(workshop_id)
-                
-                if workshop and workshop.get("scheduled_at"):
-                    # Parse workshop start time
-                    start_time_str = workshop["scheduled_at"]
-                    if start_time_str.endswith("Z"):
-                        start_time_str = start_time_str.replace("Z", "+00:00")
-                    
-                    workshop_start = datetime.fromisoformat(start_time_str)
-                    
-                    # Convert to naive datetime for comparison with IST now
-                    if workshop_start.tzinfo:
-                        workshop_start_naive = workshop_start.astimezone(IST).replace(tzinfo=None)
-                    else:
-                        workshop_start_naive = workshop_start
-                    
-                    now_ist_naive = now_ist.replace(tzinfo=None)
-                    
-                    # Only count future workshops
-                    if workshop_start_naive > now_ist_naive:
-                        total_active += 1
-                        
-                        # Count 1-day reminders
-                        if enrollment.get("reminder_1day_sent"):
-                            sent_1day += 1
-                        else:
-                            pending_1day += 1
-                        
-                        # Count 15-min reminders  
-                        if enrollment.get("reminder_15min_sent"):
-                            sent_15min += 1
-                        else:
-                            pending_15min += 1
+            total_active = row.get("total_active", 0)
+            sent_1day = row.get("sent_1day", 0)
+            sent_15min = row.get("sent_15min", 0)
+            pending_1day = row.get("pending_1day", 0)
+            pending_15min = row.get("pending_15min", 0)
             
             return {
                 "status": "success",
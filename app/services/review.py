@@ -1,6 +1,6 @@
 # app/services/review.py
 from app.core.logger import setup_logger
-from app.core.db import get_db
+from app.core.cache import async_ttl_cached, coalesce_inflight
 from app.schemas.review import (
     Review, ReviewCreate, ReviewUpdate, ReviewWithUser, 
     ReviewOperationResponse, ReviewListResponse
@@ -9,15 +9,36 @@ from app.schemas.response import ResponseModel
 from app.schemas.user import User
 from app.core.utils.bad_words import validate_review_content
 from uuid import UUID
-from typing import List, Optional, Dict
-from fastapi.concurrency import run_in_threadpool
-from supabase import Client
+from datetime import datetime
+from typing import List, Optional, Dict, Tuple
+import asyncio
+import functools
+from supabase import AsyncClient
+from pydantic import TypeAdapter
 
 log = setup_logger(__name__)
 
+_review_list_adapter = TypeAdapter(List[ReviewWithUser])
+_reviews_adapter = TypeAdapter(List[Review])
+
+def service_endpoint(action: str):
+    """Turn any unexpected exception into a logged `ResponseModel(success=False)`"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                log.error(f"Error {action}: {str(e)}")
+                return ResponseModel(success=False, message=str(e), data=None)
+        return wrapper
+    return decorator
+
 # Constants
 DEFAULT_LIMIT = 20
 MAX_LIMIT = 100
+RATING_STATS_TTL = 60  # seconds; stats are also dropped on every review write
+REVIEW_COUNT_TTL = 30  # seconds; same invalidation as the stats
 
 class ReviewService:
     
@@ -27,294 +48,325 @@ class ReviewService:
         offset = max(0, offset)
         return limit, offset
 
-    async def create_review(self, review_data: ReviewCreate, user_id: UUID, db: Client) -> ResponseModel[ReviewOperationResponse]:
+    def _paginate(self, query, limit: int, offset: int, cursor: Optional[datetime], cursor_id: Optional[int] = None):
+        """
+        Newest first, id breaking created_at ties (a bulk insert shares one now()).
+        Keyset on (created_at, id) when a cursor is given, else limit/offset.
+        """
+        query = query.order("created_at", desc=True).order("id", desc=True)
+        if cursor is not None:
+            before = cursor.isoformat()
+            if cursor_id is None:
+                # Timestamp-only cursor from older clients: rows tied with it are not reachable
+                return query.lt("created_at", before).limit(limit)
+            return query.or_(
+                f'created_at.lt."{before}",'
+                f'and(created_at.eq."{before}",id.lt.{cursor_id})'
+            ).limit(limit)
+        return query.range(offset, offset + limit - 1)
+
+    def _next_cursor(self, reviews: List[ReviewWithUser], limit: int) -> Tuple[Optional[datetime], Optional[int]]:
+        """A full page means there may be more; hand back the last (created_at, id) as the cursor"""
+        if len(reviews) < limit:
+            return None, None
+        return reviews[-1].created_at, reviews[-1].id
+
+    def _invalidate_cached_stats(self, workshop_id, user_id=None) -> None:
+        """Drop cached rating stats / review counts touched by a review write"""
+        self.get_average_rating.cache_invalidate(str(workshop_id))
+        self._count_reviews.cache_invalidate(("workshop_id", str(workshop_id)))
+        if user_id is not None:
+            self._count_reviews.cache_invalidate(("user_id", str(user_id)))
+
+    @async_ttl_cached(
+        key=lambda self, column, value, db=None: (column, str(value)),
+        ttl=REVIEW_COUNT_TTL,
+        cache_if=lambda count: count is not None
+    )
+    async def _count_reviews(self, column: str, value: UUID, db: AsyncClient) -> Optional[int]:
+        """Exact review count for one workshop/user, cached so list pages don't re-count each time"""
+        result = await db.table("reviews").select("id", count="exact", head=True).eq(column, value).execute()
+        return result.count
+
+    def _build_row(self, review_data: dict, users_by_id: Dict[str, User]) -> dict:
+        """Swap the embedded `users` join for a shared User instance"""
+        user_data = review_data.pop('users', None)
+        if user_data:
+            user = users_by_id.get(user_data['id'])
+            if user is None:
+                user = users_by_id[user_data['id']] = User(**user_data)
+            review_data['user'] = user
+        return review_data
+
+    @service_endpoint("creating review")
+    async def create_review(self, review_data: ReviewCreate, user_id: UUID, db: AsyncClient) -> ResponseModel[ReviewOperationResponse]:
         """Create a new review for a workshop"""
-        try:
-            # Content validation
-            if review_data.review_description:
-                validation = validate_review_content(review_data.review_description)
-                if not validation["is_valid"]:
-                    return ResponseModel(
-                        success=False,
-                        message=f"Review validation failed: {', '.join(validation['errors'])}",
-                        data=None
-                    )
-
-            # Check existing review
-            existing = await run_in_threadpool(
-                lambda: db.table("reviews").select("id").eq("user_id", str(user_id))
-                .eq("workshop_id", str(review_data.workshop_id)).execute()
-            )
-
-            if existing.data:
+        # Content validation
+        if review_data.review_description:
+            validation = validate_review_content(review_data.review_description)
+            if not validation["is_valid"]:
                 return ResponseModel(
                     success=False,
-                    message="You have already reviewed this workshop",
+                    message=f"Review validation failed: {', '.join(validation['errors'])}",
                     data=None
                 )
 
-            # Create review
-            review_dict = {
-                "user_id": str(user_id),
-                "workshop_id": str(review_data.workshop_id),
-                "rating": review_data.rating,
-                "review_description": review_data.review_description
-            }
-
-            result = await run_in_threadpool(
-                lambda: db.table("reviews").insert(review_dict).execute()
-            )
-            
-            if not result.data:
-                return ResponseModel(success=False, message="Failed to create review", data=None)
-
-            review = Review(**result.data[0])
-            log.info(f"Review created: {review.id} by user {user_id}")
-
+        # Create review
+        review_dict = {
+            "user_id": str(user_id),
+            "workshop_id": str(review_data.workshop_id),
+            "rating": review_data.rating,
+            "review_description": review_data.review_description
+        }
+
+        # ON CONFLICT DO NOTHING: an existing review comes back as an empty result
+        result = await db.table("reviews").upsert(
+            review_dict, on_conflict="user_id,workshop_id", ignore_duplicates=True
+        ).execute()
+        
+        if not result.data:
             return ResponseModel(
-                success=True,
-                message="Review created successfully",
-                data=ReviewOperationResponse(review=review, message="Review added successfully")
+                success=False,
+                message="You have already reviewed this workshop",
+                data=None
             )
 
-        except Exception as e:
-            log.error(f"Error creating review: {str(e)}")
-            return ResponseModel(success=False, message=str(e), data=None)
-
-    async def update_review(self, review_id: int, review_data: ReviewUpdate, user_id: UUID, db: Client) -> ResponseModel[ReviewOperationResponse]:
-        """Update user's own review"""
-        try:
-            # Content validation
+        review = Review(**result.data[0])
+        self._invalidate_cached_stats(review.workshop_id, user_id)
+        log.info(f"Review created: {review.id} by user {user_id}")
+
+        return ResponseModel(
+            success=True,
+            message="Review created successfully",
+            data=ReviewOperationResponse(review=review, message="Review added successfully")
+        )
+
+    @service_endpoint("bulk creating reviews")
+    async def create_reviews_bulk(self, rows: List[Tuple[UUID, ReviewCreate]], db: AsyncClient) -> ResponseModel[List[Review]]:
+        """Create many reviews in one request (imports / seeding). Duplicates are skipped."""
+        review_dicts = []
+        for user_id, review_data in rows:
             if review_data.review_description:
                 validation = validate_review_content(review_data.review_description)
                 if not validation["is_valid"]:
                     return ResponseModel(
                         success=False,
-                        message=f"Review validation failed: {', '.join(validation['errors'])}",
+                        message=f"Review validation failed for user {user_id}: {', '.join(validation['errors'])}",
                         data=None
                     )
+            review_dicts.append({
+                "user_id": str(user_id),
+                "workshop_id": str(review_data.workshop_id),
+                "rating": review_data.rating,
+                "review_description": review_data.review_description
+            })
 
-            # Check ownership
-            existing = await run_in_threadpool(
-                lambda: db.table("reviews").select("*").eq("id", review_id)
-                .eq("user_id", str(user_id)).execute()
-            )
+        if not review_dicts:
+            return ResponseModel(success=True, message="No reviews to create", data=[])
+
+        # Single batched insert; existing (user_id, workshop_id) pairs are ignored
+        result = await db.table("reviews").upsert(
+            review_dicts, on_conflict="user_id,workshop_id", ignore_duplicates=True
+        ).execute()
+
+        reviews = _reviews_adapter.validate_python(result.data)
+        for review in reviews:
+            self._invalidate_cached_stats(review.workshop_id, review.user_id)
+        log.info(f"Bulk review insert: {len(reviews)} created, {len(review_dicts) - len(reviews)} skipped")
+
+        return ResponseModel(
+            success=True,
+            message=f"{len(reviews)} reviews created",
+            data=reviews
+        )
 
-            if not existing.data:
+    @service_endpoint("updating review")
+    async def update_review(self, review_id: int, review_data: ReviewUpdate, user_id: UUID, db: AsyncClient) -> ResponseModel[ReviewOperationResponse]:
+        """Update user's own review"""
+        # Content validation
+        if review_data.review_description:
+            validation = validate_review_content(review_data.review_description)
+            if not validation["is_valid"]:
                 return ResponseModel(
                     success=False,
-                    message="Review not found or access denied",
+                    message=f"Review validation failed: {', '.join(validation['errors'])}",
                     data=None
                 )
 
-            # Build update dict
-            update_dict = {}
-            if review_data.rating is not None:
-                update_dict["rating"] = review_data.rating
-            if review_data.review_description is not None:
-                update_dict["review_description"] = review_data.review_description
-
-            if not update_dict:
-                return ResponseModel(success=False, message="No fields to update", data=None)
-
-            # Update review
-            result = await run_in_threadpool(
-                lambda: db.table("reviews").update(update_dict).eq("id", review_id).execute()
-            )
-
-            if not result.data:
-                return ResponseModel(success=False, message="Failed to update review", data=None)
-
-            review = Review(**result.data[0])
-            log.info(f"Review updated: {review_id} by user {user_id}")
+        # Check ownership
+        existing = await db.table("reviews").select("*").eq("id", review_id) \
+            .eq("user_id", user_id).execute()
 
+        if not existing.data:
             return ResponseModel(
-                success=True,
-                message="Review updated successfully",
-                data=ReviewOperationResponse(review=review, message="Review updated successfully")
+                success=False,
+                message="Review not found or access denied",
+                data=None
             )
 
-        except Exception as e:
-            log.error(f"Error updating review: {str(e)}")
-            return ResponseModel(success=False, message=str(e), data=None)
-
-    async def get_reviews_by_workshop(self, workshop_id: UUID, limit: int = DEFAULT_LIMIT, offset: int = 0, db: Client = None) -> ResponseModel[ReviewListResponse]:
+        # Build update dict
+        update_dict = {}
+        if review_data.rating is not None:
+            update_dict["rating"] = review_data.rating
+        if review_data.review_description is not None:
+            update_dict["review_description"] = review_data.review_description
+
+        if not update_dict:
+            return ResponseModel(success=False, message="No fields to update", data=None)
+
+        # Update review
+        result = await db.table("reviews").update(update_dict).eq("id", review_id).execute()
+
+        if not result.data:
+            return ResponseModel(success=False, message="Failed to update review", data=None)
+
+        review = Review(**result.data[0])
+        self._invalidate_cached_stats(review.workshop_id)
+        log.info(f"Review updated: {review_id} by user {user_id}")
+
+        return ResponseModel(
+            success=True,
+            message="Review updated successfully",
+            data=ReviewOperationResponse(review=review, message="Review updated successfully")
+        )
+
+    @coalesce_inflight(
+        key=lambda self, workshop_id, limit=DEFAULT_LIMIT, offset=0, db=None, cursor=None, cursor_id=None: (str(workshop_id), limit, offset, cursor, cursor_id)
+    )
+    @service_endpoint("getting workshop reviews")
+    async def get_reviews_by_workshop(self, workshop_id: UUID, limit: int = DEFAULT_LIMIT, offset: int = 0, db: AsyncClient = None, cursor: Optional[datetime] = None, cursor_id: Optional[int] = None) -> ResponseModel[ReviewListResponse]:
         """Get all reviews for a workshop"""
-        try:
-            limit, offset = self._validate_pagination(limit, offset)
-            
-            # Get reviews with user info
-            result = await run_in_threadpool(
-                lambda: db.table("reviews").select(
-                    "*, users(id, name, email, profile_pic_url, created_at, role)"
-                ).eq("workshop_id", str(workshop_id))
-                .order("created_at", desc=True)
-                .range(offset, offset + limit - 1).execute()
-            )
+        limit, offset = self._validate_pagination(limit, offset)
+        wid = str(workshop_id)
 
-            # Get count
-            count_result = await run_in_threadpool(
-                lambda: db.table("reviews").select("id", count="exact")
-                .eq("workshop_id", str(workshop_id)).execute()
-            )
-
-            reviews_with_user = []
-            total_rating = 0
-            rating_count = 0
-
-            for review_data in result.data:
-                user_data = review_data.pop('users', None)
-                user = User(**user_data) if user_data else None
-                
-                review_with_user = ReviewWithUser(**review_data, user=user)
-                reviews_with_user.append(review_with_user)
-                
-                if review_data.get('rating'):
-                    total_rating += review_data['rating']
-                    rating_count += 1
-
-            # Calculate average
-            average_rating = round(total_rating / rating_count, 2) if rating_count > 0 else None
-
-            return ResponseModel(
-                success=True,
-                message="Reviews retrieved successfully",
-                data=ReviewListResponse(
-                    reviews=reviews_with_user,
-                    total_count=count_result.count,
-                    workshop_id=workshop_id,
-                    average_rating=average_rating
-                )
+        # Page, total count and workshop-wide rating stats are independent; run them at once
+        result, total_count, stats_result = await asyncio.gather(
+            self._paginate(
+                db.table("reviews").select(
+                    "*, users(id, name, email, profile_pic_url, created_at, role)"
+                ).eq("workshop_id", workshop_id),
+                limit, offset, cursor, cursor_id
+            ).execute(),
+            self._count_reviews("workshop_id", workshop_id, db),
+            db.rpc("workshop_rating_stats", {"wid": wid}).execute()
+        )
+
+        # Workshop-wide average, not just this page
+        avg_rating = stats_result.data[0]["avg_rating"] if stats_result.data else None
+        average_rating = round(float(avg_rating), 2) if avg_rating is not None else None
+
+        # Same author on many rows -> build their User once; whole page validated in one pass
+        users_by_id = {}
+        reviews_with_user = _review_list_adapter.validate_python(
+            [self._build_row(review_data, users_by_id) for review_data in result.data]
+        )
+        next_cursor, next_cursor_id = self._next_cursor(reviews_with_user, limit)
+
+        return ResponseModel(
+            success=True,
+            message="Reviews retrieved successfully",
+            data=ReviewListResponse(
+                reviews=reviews_with_user,
+                total_count=total_count or 0,
+                workshop_id=workshop_id,
+                average_rating=average_rating,
+                next_cursor=next_cursor,
+                next_cursor_id=next_cursor_id
             )
+        )
 
-        except Exception as e:
-            log.error(f"Error getting workshop reviews: {str(e)}")
-            return ResponseModel(success=False, message=str(e), data=None)
-
-    async def get_reviews_by_user(self, user_id: UUID, limit: int = DEFAULT_LIMIT, offset: int = 0, db: Client = None) -> ResponseModel[ReviewListResponse]:
+    @service_endpoint("getting user reviews")
+    async def get_reviews_by_user(self, user_id: UUID, limit: int = DEFAULT_LIMIT, offset: int = 0, db: AsyncClient = None, cursor: Optional[datetime] = None, cursor_id: Optional[int] = None) -> ResponseModel[ReviewListResponse]:
         """Get all reviews by a user"""
-        try:
-            limit, offset = self._validate_pagination(limit, offset)
-            
-            result = await run_in_threadpool(
-                lambda: db.table("reviews").select(
+        limit, offset = self._validate_pagination(limit, offset)
+        
+        result, total_count = await asyncio.gather(
+            self._paginate(
+                db.table("reviews").select(
                     "*, users(id, name, email, profile_pic_url, created_at, role)"
-                ).eq("user_id", str(user_id))
-                .order("created_at", desc=True)
-                .range(offset, offset + limit - 1).execute()
+                ).eq("user_id", user_id),
+                limit, offset, cursor, cursor_id
+            ).execute(),
+            self._count_reviews("user_id", user_id, db)
+        )
+
+        # Same author on many rows -> build their User once; whole page validated in one pass
+        users_by_id = {}
+        reviews_with_user = _review_list_adapter.validate_python(
+            [self._build_row(review_data, users_by_id) for review_data in result.data]
+        )
+        next_cursor, next_cursor_id = self._next_cursor(reviews_with_user, limit)
+
+        return ResponseModel(
+            success=True,
+            message="User reviews retrieved successfully",
+            data=ReviewListResponse(
+                reviews=reviews_with_user,
+                total_count=total_count or 0,
+                workshop_id=None,
+                average_rating=None,
+                next_cursor=next_cursor,
+                next_cursor_id=next_cursor_id
             )
-
-            count_result = await run_in_threadpool(
-                lambda: db.table("reviews").select("id", count="exact")
-                .eq("user_id", str(user_id)).execute()
-            )
-
-            reviews_with_user = []
-            for review_data in result.data:
-                user_data = review_data.pop('users', None)
-                user = User(**user_data) if user_data else None
-                review_with_user = ReviewWithUser(**review_data, user=user)
-                reviews_with_user.append(review_with_user)
-
-            return ResponseModel(
-                success=True,
-                message="User reviews retrieved successfully",
-                data=ReviewListResponse(
-                    reviews=reviews_with_user,
-                    total_count=count_result.count,
-                    workshop_id=None,
-                    average_rating=None
-                )
-            )
-
-        except Exception as e:
-            log.error(f"Error getting user reviews: {str(e)}")
-            return ResponseModel(success=False, message=str(e), data=None)
-
-    async def get_average_rating(self, workshop_id: UUID, db: Client) -> ResponseModel[Dict]:
+        )
+
+    @async_ttl_cached(
+        key=lambda self, workshop_id, db=None: str(workshop_id),
+        ttl=RATING_STATS_TTL,
+        cache_if=lambda response: response.success
+    )
+    @service_endpoint("getting average rating")
+    async def get_average_rating(self, workshop_id: UUID, db: AsyncClient) -> ResponseModel[Dict]:
         """Get workshop rating statistics"""
-        try:
-            result = await run_in_threadpool(
-                lambda: db.table("reviews").select("rating")
-                .eq("workshop_id", str(workshop_id)).execute()
-            )
-
-            if not result.data:
-                return ResponseModel(
-                    success=True,
-                    message="No reviews found",
-                    data={
-                        "workshop_id": workshop_id,
-                        "average_rating": 0.0,
-                        "total_reviews": 0,
-                        "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-                    }
-                )
-
-            ratings = [r["rating"] for r in result.data if r["rating"]]
-            
-            if not ratings:
-                return ResponseModel(success=True, message="No valid ratings", data={
-                    "workshop_id": workshop_id, "average_rating": 0.0, "total_reviews": 0,
-                    "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-                })
-
-            # Calculate stats
-            average_rating = sum(ratings) / len(ratings)
-            rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            for rating in ratings:
-                rating_distribution[rating] += 1
+        # Aggregated in Postgres; always exactly one row
+        result = await db.rpc("workshop_rating_stats", {"wid": str(workshop_id)}).execute()
+        stats = result.data[0] if result.data else {}
 
+        if not stats.get("total"):
             return ResponseModel(
                 success=True,
-                message="Rating statistics retrieved",
+                message="No reviews found",
                 data={
                     "workshop_id": workshop_id,
-                    "average_rating": round(average_rating, 2),
-                    "total_reviews": len(ratings),
-                    "rating_distribution": rating_distribution
+                    "average_rating": 0.0,
+                    "total_reviews": 0,
+                    "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
                 }
             )
 
-        except Exception as e:
-            log.error(f"Error getting average rating: {str(e)}")
-            return ResponseModel(success=False, message=str(e), data=None)
+        return ResponseModel(
+            success=True,
+            message="Rating statistics retrieved",
+            data={
+                "workshop_id": workshop_id,
+                "average_rating": round(float(stats["avg_rating"]), 2),
+                "total_reviews": stats["total"],
+                "rating_distribution": {
+                    1: stats["r1"], 2: stats["r2"], 3: stats["r3"], 4: stats["r4"], 5: stats["r5"]
+                }
+            }
+        )
 
-    async def delete_review(self, review_id: int, user_id: UUID, is_admin: bool, db: Client) -> ResponseModel[Dict]:
+    @service_endpoint("deleting review")
+    async def delete_review(self, review_id: int, user_id: UUID, is_admin: bool, db: AsyncClient) -> ResponseModel[Dict]:
         """Delete a review"""
-        try:
-            # Check permission
-            if is_admin:
-                existing = await run_in_threadpool(
-                    lambda: db.table("reviews").select("*").eq("id", review_id).execute()
-                )
-            else:
-                existing = await run_in_threadpool(
-                    lambda: db.table("reviews").select("*").eq("id", review_id)
-                    .eq("user_id", str(user_id)).execute()
-                )
-
-            if not existing.data:
-                return ResponseModel(success=False, message="Review not found or access denied", data=None)
-
-            # Delete
-            result = await run_in_threadpool(
-                lambda: db.table("reviews").delete().eq("id", review_id).execute()
-            )
-
-            if not result.data:
-                return ResponseModel(success=False, message="Failed to delete review", data=None)
-
-            log.info(f"Review deleted: {review_id} by user {user_id} (admin: {is_admin})")
-            return ResponseModel(
-                success=True,
-                message="Review deleted successfully",
-                data={"deleted_review_id": review_id}
-            )
-
-        except Exception as e:
-            log.error(f"Error deleting review: {str(e)}")
-            return ResponseModel(success=False, message=str(e), data=None)
+        # Ownership check and delete in one statement; no row back = not found or not the owner
+        query = db.table("reviews").delete().eq("id", review_id)
+        if not is_admin:
+            query = query.eq("user_id", user_id)
+        result = await query.execute()
+
+        if not result.data:
+            return ResponseModel(success=False, message="Review not found or access denied", data=None)
+
+        self._invalidate_cached_stats(result.data[0]["workshop_id"], result.data[0]["user_id"])
+
+        log.info(f"Review deleted: {review_id} by user {user_id} (admin: {is_admin})")
+        return ResponseModel(
+            success=True,
+            message="Review deleted successfully",
+            data={"deleted_review_id": review_id}
+        )
 
 # Singleton instance
 review_service = ReviewService()
@@ -1,29 +1,140 @@
 # app/services/user.py
 
+import asyncio
 from uuid import UUID
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from app.schemas.user import (
     UserUpdate, User, ProfileCompletionStatus, UserOperationResponse, 
     UserPointsResponse, UserListResponse
 )
 from app.schemas.response import ResponseModel
 from app.core.logger import setup_logger
-from app.core.db import get_db, get_db_admin
-from typing import Dict, Any, List
+from app.core.db import get_async_db, get_async_db_admin
+from app.core.utils.ndjson import ndjson_line
+from app.core.cache import async_ttl_cached, BatchLoader, shared_get, shared_set, shared_delete, shared_lock
+from typing import Dict, Any, List, AsyncIterator
+from pydantic import TypeAdapter
 
 log = setup_logger(__name__)
 
+# Above this many rows, validation moves off the event loop
+OFFLOAD_VALIDATION_ROWS = 500
+
+
+async def _validate_users(rows: List[Dict[str, Any]]) -> List[User]:
+    """Validate a result set; big ones (bulk id lookups) run in the threadpool so other requests keep flowing."""
+    if len(rows) > OFFLOAD_VALIDATION_ROWS:
+        return await run_in_threadpool(_users_adapter.validate_python, rows)
+    return _users_adapter.validate_python(rows)
+
+
+def _is_blank(value: Any) -> bool:
+    """Empty for profile-completion purposes: None/falsy, or a whitespace-only string."""
+    return not value or (value.__class__ is str and not value.strip())
+
+
+# Rows fetched per DB round-trip while streaming
+STREAM_CHUNK_SIZE = 500
+
+# Ids per `id IN (...)` query; keeps the request URL around 7-8 KB
+IDS_PER_REQUEST = 200
+
+# Only the columns the User schema actually has
+USER_COLUMNS = ",".join(User.model_fields)
+
+# Validates a whole result set in one call instead of one User(**row) per row
+_users_adapter = TypeAdapter(List[User])
+
+
+async def _fetch_users_by_ids(user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """One `id IN (...)` query for a batch of ids -> {id: row}."""
+    db = get_async_db()
+    response = await db.table("users").select(USER_COLUMNS).in_("id", user_ids).execute()
+    return {row["id"]: row for row in response.data or []}
+
+# Concurrent get_user_by_id calls in the same tick share one query
+_user_loader = BatchLoader(_fetch_users_by_ids)
+
 class UserService:
 
+    # Required fields for a complete profile (future-proof).
+    # Keep in sync with update_user_and_check_profile() in supabase/migrations.
+    PROFILE_REQUIRED_FIELDS = (
+        ("name", "Full name"),
+        ("profile_pic_url", "Profile picture"),
+        # Future fields can be added here:
+        # ("bio", "Bio/Description"),
+        # ("year", "Year of study"),
+        # ("college", "College name"),
+        # ("phone", "Phone number"),
+        # ("linkedin", "LinkedIn profile"),
+        # ("github", "GitHub profile"),
+    )
+    PROFILE_REQUIRED_TOTAL = len(PROFILE_REQUIRED_FIELDS)
+    PROFILE_COMPLETION_POINTS = 10
+    # Just what the completion check reads
+    PROFILE_CHECK_COLUMNS = ",".join(["profile_complete", "points", *(field for field, _ in PROFILE_REQUIRED_FIELDS)])
+    USER_ROW_TTL = 5  # seconds; dropped on every write through this service
+    PROFILE_STATUS_SHARED_TTL = 30  # seconds, in Redis (shared by all workers)
+
     @staticmethod
-    def update_user(user_id: UUID, data: UserUpdate) -> ResponseModel[UserOperationResponse]:
+    def _profile_status_key(user_id: UUID) -> str:
+        return f"profile:{user_id}"
+
+    @staticmethod
+    async def _invalidate_user_cache(user_id: UUID) -> None:
+        """Drop this user's cached row (this worker) and profile status (all workers)."""
+        UserService._fetch_user_row.cache_invalidate(str(user_id))
+        await shared_delete(UserService._profile_status_key(user_id))
+
+    @staticmethod
+    @async_ttl_cached(
+        key=lambda user_id: str(user_id),
+        ttl=USER_ROW_TTL,
+        cache_if=lambda row: row is not None
+    )
+    async def _fetch_user_row(user_id: UUID) -> Dict[str, Any] | None:
+        """Raw users row for read-only checks (frontend polls profile progress); None if missing."""
+        db = get_async_db_admin()
+        response = await db.table("users").select(UserService.PROFILE_CHECK_COLUMNS) \
+            .eq("id", str(user_id)).limit(1).execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    def _profile_status(user_data: Dict[str, Any], newly_completed: bool) -> ProfileCompletionStatus:
+        """Build ProfileCompletionStatus from a users row (no DB access)."""
+        missing_fields = []
+        filled_fields = []
+        
+        get = user_data.get
+        for field, description in UserService.PROFILE_REQUIRED_FIELDS:
+            if _is_blank(get(field)):
+                missing_fields.append({"field": field, "description": description})
+            else:
+                filled_fields.append(field)
+        
+        total_fields = UserService.PROFILE_REQUIRED_TOTAL
+        completion_percentage = (len(filled_fields) * 100) // total_fields if total_fields > 0 else 0
+        
+        return ProfileCompletionStatus(
+            is_complete=len(missing_fields) == 0,
+            missing_fields=missing_fields,
+            completed_fields=filled_fields,
+            completion_percentage=completion_percentage,
+            newly_completed=newly_completed,
+            points_awarded=UserService.PROFILE_COMPLETION_POINTS if newly_completed else 0
+        )
+
+    @staticmethod
+    async def update_user(user_id: UUID, data: UserUpdate) -> ResponseModel[UserOperationResponse]:
         """
         Update name or profile picture for a user.
         Automatically checks profile completion and awards points if completed.
         
         Returns ResponseModel with user and profile status.
         """
-        db = get_db_admin()
+        db = get_async_db_admin()
         try:
             log.debug(f"Updating user: {user_id}")
             
@@ -36,7 +147,11 @@ class UserService:
                     detail="No fields to update"
                 )
 
-            response = db.table("users").update(update_data).eq("id", str(user_id)).execute()
+            # Update, completion check and points award happen atomically in one call
+            response = await db.rpc(
+                "update_user_and_check_profile",
+                {"uid": str(user_id), "patch": update_data}
+            ).execute()
             
             if not response.data:
                 log.warning(f"User not found for update: {user_id}")
@@ -45,15 +160,11 @@ class UserService:
                     detail="User not found"
                 )
 
-            # Get updated user data
-            user_response = db.table("users").select("*").eq("id", str(user_id)).single().execute()
-            updated_user = User(**user_response.data)
+            updated_user = User(**response.data["user"])
+            profile_status = UserService._profile_status(response.data["user"], response.data["newly_completed"])
+            await UserService._invalidate_user_cache(user_id)
             log.info(f"User {user_id} updated with {list(update_data.keys())}")
             
-            # 🎯 Automatic profile completion check after update
-            profile_check_response = UserService.is_profile_complete(user_id)
-            profile_status = profile_check_response.data
-            
             # Log profile completion status
             if profile_status.newly_completed:
                 log.info(f"🎉 Profile completed for user {user_id}! Awarded {profile_status.points_awarded} points.")
@@ -83,9 +194,9 @@ class UserService:
             )
 
     @staticmethod
-    def increment_user_points(user_id: UUID, amount: int) -> ResponseModel[UserPointsResponse]:
+    async def increment_user_points(user_id: UUID, amount: int) -> ResponseModel[UserPointsResponse]:
         """Increment user's points and return updated user with points info."""
-        db = get_db_admin()
+        db = get_async_db_admin()
         try:
             log.debug(f"Incrementing points for user {user_id}: +{amount}")
             
@@ -97,33 +208,19 @@ class UserService:
                     detail="Points amount must be positive"
                 )
 
-            # Get current user data first
-            current_user_response = db.table("users").select("points").eq("id", str(user_id)).single().execute()
-            if not current_user_response.data:
+            # Single atomic UPDATE ... RETURNING *; no rows back means no such user
+            response = await db.rpc("increment_points", {"uid": str(user_id), "delta": amount}).execute()
+
+            if not response.data:
                 log.warning(f"User not found for points increment: {user_id}")
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, 
                     detail="User not found"
                 )
-            
-            current_points = current_user_response.data.get("points", 0) or 0
-            new_total = current_points + amount
-
-            # Increment points manually (since DB function doesn't exist)
-            response = db.table("users").update({
-                "points": new_total
-            }).eq("id", str(user_id)).execute()
-
-            if not response.data:
-                log.error(f"Failed to increment points for user: {user_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
-                    detail="Failed to increment points"
-                )
 
-            # Get updated user data
-            updated_user_response = db.table("users").select("*").eq("id", str(user_id)).single().execute()
-            updated_user = User(**updated_user_response.data)
+            updated_user = User(**response.data[0])
+            new_total = updated_user.points or 0
+            await UserService._invalidate_user_cache(user_id)
             
             points_response_data = UserPointsResponse(
                 user=updated_user,
@@ -149,115 +246,77 @@ class UserService:
             )
 
     @staticmethod
-    def is_profile_complete(user_id: UUID) -> ResponseModel[ProfileCompletionStatus]:
+    async def _award_profile_completion(user_id: UUID) -> ProfileCompletionStatus:
+        """Flag a complete profile and award its points through the atomic RPC (no-op if already awarded)."""
+        db = get_async_db_admin()
+        response = await db.rpc(
+            "update_user_and_check_profile",
+            {"uid": str(user_id), "patch": {}}
+        ).execute()
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        profile_status = UserService._profile_status(response.data["user"], response.data["newly_completed"])
+        await UserService._invalidate_user_cache(user_id)
+        if profile_status.newly_completed:
+            log.info(f"🎉 Profile completed for user {user_id}! Awarded {profile_status.points_awarded} points.")
+        return profile_status
+
+    @staticmethod
+    async def get_profile_completion_status(user_id: UUID) -> ResponseModel[ProfileCompletionStatus]:
         """
-        Dynamic profile completion checker - future-proof for new fields.
-        
-        Returns ResponseModel with profile completion details.
+        Get profile completion status; useful for frontend to show completion progress.
+        Only writes when a complete profile hasn't been flagged yet (one-time points award).
         """
-        db = get_db_admin()
         try:
-            log.debug(f"Checking dynamic profile completion for user: {user_id}")
-            
-            # Get all user data to check completeness
-            response = db.table("users").select("*").eq("id", str(user_id)).single().execute()
-
-            if not response.data:
-                log.warning(f"User not found for profile check: {user_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, 
-                    detail="User not found"
+            log.debug(f"Getting profile completion status for user: {user_id}")
+            cache_key = UserService._profile_status_key(user_id)
+            cached = await shared_get(cache_key)
+            if cached is None and not await shared_lock(f"{cache_key}:lock", ttl=5):
+                # Another worker is filling it; give it a moment before doing the work ourselves
+                await asyncio.sleep(0.05)
+                cached = await shared_get(cache_key)
+
+            if cached is not None:
+                profile_status = ProfileCompletionStatus.model_validate_json(cached)
+            else:
+                # Rebuilding the shared entry: this worker's row cache may predate a write made
+                # on another worker, so read the row fresh rather than publish it for 30 s
+                UserService._fetch_user_row.cache_invalidate(str(user_id))
+                user_data = await UserService._fetch_user_row(user_id)
+                if user_data is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="User not found"
+                    )
+
+                profile_status = UserService._profile_status(user_data, newly_completed=False)
+                if profile_status.is_complete and not user_data.get("profile_complete"):
+                    # Filled in without update_user (OAuth sign-up sets name/picture): award now.
+                    # An empty patch runs just the locked completion check, so this awards once.
+                    profile_status = await UserService._award_profile_completion(user_id)
+                await shared_set(
+                    cache_key,
+                    profile_status.model_copy(update={"newly_completed": False, "points_awarded": 0})
+                        .model_dump_json().encode(),
+                    ttl=UserService.PROFILE_STATUS_SHARED_TTL
                 )
 
-            user_data = response.data
-            current_profile_complete = user_data.get("profile_complete", False)
-            
-            # Define required fields for complete profile (future-proof)
-            required_fields = {
-                "name": "Full name",
-                "profile_pic_url": "Profile picture",
-                # Future fields can be added here:
-                # "bio": "Bio/Description", 
-                # "year": "Year of study",
-                # "college": "College name",
-                # "phone": "Phone number",
-                # "linkedin": "LinkedIn profile",
-                # "github": "GitHub profile"
-            }
-            
-            # Check which fields are missing
-            missing_fields = []
-            filled_fields = []
-            
-            for field, description in required_fields.items():
-                value = user_data.get(field)
-                if not value or (isinstance(value, str) and not value.strip()):
-                    missing_fields.append({"field": field, "description": description})
-                else:
-                    filled_fields.append(field)
-            
-            # Calculate completion percentage
-            total_fields = len(required_fields)
-            completed_fields = len(filled_fields)
-            completion_percentage = int((completed_fields / total_fields) * 100) if total_fields > 0 else 0
-            
-            # Check if profile is now complete
-            is_complete = len(missing_fields) == 0
-            newly_completed = is_complete and not current_profile_complete
-            
-            # If profile just became complete, mark it and reward points
-            if newly_completed:
-                # Get current points
-                current_points = user_data.get("points", 0) or 0
-                new_points = current_points + 10
-                
-                # Update profile_complete status and add points
-                db.table("users").update({
-                    "profile_complete": True,
-                    "points": new_points
-                }).eq("id", str(user_id)).execute()
-                
-                log.info(f"🎉 User {user_id} profile completed! Awarded 10 points.")
-            
-            profile_status = ProfileCompletionStatus(
-                is_complete=is_complete,
-                missing_fields=missing_fields,
-                completed_fields=filled_fields,
-                completion_percentage=completion_percentage,
-                newly_completed=newly_completed,
-                points_awarded=10 if newly_completed else 0
-            )
-            
-            log.debug(f"Profile check result for {user_id}: {completion_percentage}% complete")
-            
-            message = "Profile already complete" if is_complete else f"Profile {completion_percentage}% complete"
-            if newly_completed:
-                message = "🎉 Profile completed! 10 points awarded!"
-            
+            message = "Profile already complete" if profile_status.is_complete \
+                else f"Profile {profile_status.completion_percentage}% complete"
+            if profile_status.newly_completed:
+                message = f"🎉 Profile completed! {profile_status.points_awarded} points awarded!"
+
             return ResponseModel[ProfileCompletionStatus](
                 success=True,
                 message=message,
                 data=profile_status
             )
-
         except HTTPException:
             raise
-        except Exception as e:
-            log.error(f"Error checking profile completion for {user_id}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
-                detail="Failed to check profile completion"
-            )
-
-    @staticmethod
-    def get_profile_completion_status(user_id: UUID) -> ResponseModel[ProfileCompletionStatus]:
-        """
-        Get profile completion status without triggering updates.
-        Useful for frontend to show completion progress.
-        """
-        try:
-            log.debug(f"Getting profile completion status for user: {user_id}")
-            return UserService.is_profile_complete(user_id)
         except Exception as e:
             log.error(f"Error getting profile status for {user_id}: {str(e)}")
             raise HTTPException(
@@ -266,36 +325,28 @@ class UserService:
             )
 
     @staticmethod
-    def delete_user_by_id(user_id: UUID) -> ResponseModel[User]:
+    async def delete_user_by_id(user_id: UUID) -> ResponseModel[User]:
         """Soft delete user by setting profile_complete=false (admin-only)."""
-        db = get_db_admin()
+        db = get_async_db_admin()
         try:
             log.debug(f"Soft deleting user: {user_id}")
             
-            # Check if user exists first
-            existing = db.table("users").select("*").eq("id", str(user_id)).single().execute()
-            if not existing.data:
-                log.warning(f"User not found for deletion: {user_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, 
-                    detail="User not found"
-                )
-
-            # Soft delete by marking profile as incomplete
-            response = db.table("users").update({
+            # Soft delete by marking profile as incomplete; no row back means no such user
+            response = await db.table("users").update({
                 "profile_complete": False,
                 "name": None,
                 "profile_pic_url": None
-            }).eq("id", str(user_id)).select("*").execute()
+            }).eq("id", str(user_id)).execute()
 
             if not response.data:
-                log.error(f"Failed to delete user: {user_id}")
+                log.warning(f"User not found for deletion: {user_id}")
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Delete operation failed"
+                    status_code=status.HTTP_404_NOT_FOUND, 
+                    detail="User not found"
                 )
 
             deleted_user = User(**response.data[0])
+            await UserService._invalidate_user_cache(user_id)
             log.info(f"User soft deleted: {user_id} (email: {deleted_user.email})")
             
             return ResponseModel[User](
@@ -314,9 +365,9 @@ class UserService:
             )
 
     @staticmethod
-    def search_users_by_name(name_query: str) -> ResponseModel[UserListResponse]:
-        """Search users by partial name (case-insensitive)."""
-        db = get_db()
+    async def search_users_by_name(name_query: str, limit: int = 50) -> ResponseModel[UserListResponse]:
+        """Search users by partial name (case-insensitive), at most `limit` results ordered by name."""
+        db = get_async_db()
         try:
             log.debug(f"Searching users by name: '{name_query}'")
             
@@ -328,12 +379,20 @@ class UserService:
                     detail="Search query must be at least 2 characters long"
                 )
 
+            if limit <= 0 or limit > 100:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Limit must be between 1 and 100"
+                )
+
             clean_query = name_query.strip()
-            response = db.table("users").select("*").eq("profile_complete", True).ilike("name", f"%{clean_query}%").execute()
+            response = await db.table("users").select(USER_COLUMNS).eq("profile_complete", True) \
+                .ilike("name", f"%{clean_query}%").order("name").limit(limit).execute()
             
-            users = [User(**u) for u in response.data or []]
+            users = await _validate_users(response.data or [])
             
-            search_response_data = UserListResponse(
+            # Users were just validated by the adapter; don't walk them again
+            search_response_data = UserListResponse.model_construct(
                 users=users,
                 total_count=len(users),
                 search_query=clean_query
@@ -361,9 +420,9 @@ class UserService:
             )
 
     @staticmethod
-    def get_all_users_paginated(offset: int, limit: int) -> ResponseModel[UserListResponse]:
+    async def get_all_users_paginated(offset: int, limit: int) -> ResponseModel[UserListResponse]:
         """Fetch paginated users."""
-        db = get_db()
+        db = get_async_db()
         try:
             log.debug(f"Fetching paginated users: offset={offset}, limit={limit}")
             
@@ -379,14 +438,13 @@ class UserService:
                     detail="Limit must be between 1 and 100"
                 )
 
-            response = db.table("users").select("*").range(offset, offset + limit - 1).execute()
-            users = [User(**u) for u in response.data or []]
-            
-            # Get total count
-            count_response = db.table("users").select("id", count="exact").execute()
-            total_count = count_response.count if count_response.count is not None else 0
+            # Page and total count in one request (PostgREST Prefer: count=exact)
+            response = await db.table("users").select(USER_COLUMNS, count="exact") \
+                .range(offset, offset + limit - 1).execute()
+            users = await _validate_users(response.data or [])
+            total_count = response.count if response.count is not None else 0
             
-            paginated_response_data = UserListResponse(
+            paginated_response_data = UserListResponse.model_construct(
                 users=users,
                 total_count=total_count
             )
@@ -409,22 +467,21 @@ class UserService:
             )
 
     @staticmethod
-    def get_user_by_id(user_id: UUID) -> ResponseModel[User]:
+    async def get_user_by_id(user_id: UUID) -> ResponseModel[User]:
         """Fetch user by UUID."""
-        db = get_db()
         try:
             log.debug(f"Fetching user by ID: {user_id}")
             
-            response = db.table("users").select("*").eq("id", str(user_id)).single().execute()
+            user_data = await _user_loader.load(str(user_id))
 
-            if not response.data:
+            if not user_data:
                 log.warning(f"User not found: {user_id}")
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, 
                     detail="User not found"
                 )
 
-            user = User(**response.data)
+            user = User(**user_data)
             log.debug(f"User retrieved: {user.email} (ID: {user_id})")
             
             return ResponseModel[User](
@@ -441,3 +498,60 @@ class UserService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                 detail="Failed to fetch user"
             )
+
+    @staticmethod
+    async def get_users_by_ids(user_ids: List[UUID]) -> ResponseModel[UserListResponse]:
+        """Fetch many users, IDS_PER_REQUEST ids per query run concurrently (missing ids are skipped)."""
+        db = get_async_db()
+        try:
+            unique_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+            log.debug(f"Fetching {len(unique_ids)} users by ID")
+
+            if not unique_ids:
+                return ResponseModel[UserListResponse](
+                    success=True,
+                    message="No users requested",
+                    data=UserListResponse(users=[], total_count=0)
+                )
+
+            # ~37 URL bytes per id: split so each `id IN (...)` GET stays under proxy/PostgREST limits
+            responses = await asyncio.gather(*(
+                db.table("users").select(USER_COLUMNS)
+                    .in_("id", unique_ids[i:i + IDS_PER_REQUEST]).execute()
+                for i in range(0, len(unique_ids), IDS_PER_REQUEST)
+            ))
+            users = await _validate_users([row for response in responses for row in response.data or []])
+
+            return ResponseModel[UserListResponse](
+                success=True,
+                message=f"Retrieved {len(users)} of {len(unique_ids)} users",
+                data=UserListResponse.model_construct(users=users, total_count=len(users), search_query=None)
+            )
+
+        except Exception as e:
+            log.error(f"Error fetching users by IDs: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+                detail="Failed to fetch users"
+            )
+
+    @staticmethod
+    async def stream_users_ndjson(offset: int, limit: int) -> AsyncIterator[bytes]:
+        """
+        Yield users as NDJSON lines, oldest first.
+        Rows are fetched in STREAM_CHUNK_SIZE pages, so memory stays flat however large `limit` is.
+        Arguments must already be validated: errors can't become HTTP responses mid-stream.
+        """
+        db = get_async_db()
+        end = offset + limit
+        while offset < end:
+            chunk_end = min(offset + STREAM_CHUNK_SIZE, end)
+            response = await db.table("users").select(USER_COLUMNS) \
+                .order("created_at").order("id") \
+                .range(offset, chunk_end - 1).execute()
+            rows = response.data or []
+            for row in rows:
+                yield ndjson_line(row)
+            if len(rows) < chunk_end - offset:
+                break
+            offset = chunk_end
@@ -1,11 +1,15 @@
 # app/services/user_workshop.py
-from typing import List, Optional
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
 
 from fastapi import HTTPException, status
+from postgrest.exceptions import APIError
+from app.core.cache import TTLCache, get_redis, shared_get, shared_set, shared_delete
+from app.core.utils.ndjson import ndjson_line
 from app.core.logger import setup_logger
-from app.core.db import get_db, get_db_admin
+from app.core.db import get_async_db, get_async_db_admin
 from app.schemas.user_workshop import (
     RegisterUserToWorkshopSchema,
     UserWorkshopRelation,
@@ -18,40 +22,93 @@ from app.schemas.user_workshop import (
 
 log = setup_logger(__name__)
 
+# Python 3.11+ fromisoformat accepts PostgREST's trailing "Z" itself (project needs >=3.12)
+_parse_ts = datetime.fromisoformat
+
+# Postgres SQLSTATE for unique_violation
+UNIQUE_VIOLATION = "23505"
+
+# Participant / registration lists, keyed by workshop_id / user_id. With REDIS_URL they live
+# in Redis under uw:workshop:{id} / uw:user:{id}, so a write on one worker is seen by all;
+# otherwise in this process only. Writes through this service drop the affected entries; the
+# TTL bounds staleness from reminder flags flipped by the notification job.
+REGISTRATION_LISTS_TTL = 30
+_workshop_users_cache = TTLCache(maxsize=1_000, ttl=REGISTRATION_LISTS_TTL)
+_user_workshops_cache = TTLCache(maxsize=10_000, ttl=REGISTRATION_LISTS_TTL)
+
+
+# Embedded selects for the participant / registration lists
+_WORKSHOP_USERS_SELECT = (
+    "user_id,created_at,reminder_1day_sent,reminder_15min_sent,"
+    "user:users(name,email,profile_pic_url,points,role)"
+)
+_USER_WORKSHOPS_SELECT = (
+    "workshop_id,created_at,reminder_1day_sent,reminder_15min_sent,"
+    "workshop:workshops(title,description,technologies,conducted_by,scheduled_at)"
+)
+
+# Reminder kind -> user_workshop flag column
+_FIELD_BY_KIND = {"1day": "reminder_1day_sent", "15min": "reminder_15min_sent"}
+
+# Participant rows fetched per DB round-trip while streaming
+STREAM_CHUNK_SIZE = 500
+
+
+async def _get_cached_list(local: TTLCache, prefix: str, key: str, model):
+    """Cached list for `key`: from Redis when configured (shared by all workers), else in-process."""
+    if get_redis() is None:
+        return local.get(key)
+    cached = await shared_get(f"{prefix}:{key}")
+    return model.model_validate_json(cached) if cached is not None else None
+
+
+async def _set_cached_list(local: TTLCache, prefix: str, key: str, value) -> None:
+    if get_redis() is None:
+        local.set(key, value)
+    else:
+        await shared_set(f"{prefix}:{key}", value.model_dump_json().encode(), ttl=REGISTRATION_LISTS_TTL)
+
+
+async def _invalidate_registration_lists(pairs) -> None:
+    """Drop the cached lists of every (user_id, workshop_id) in `pairs`, here and in Redis."""
+    keys = set()
+    for uid, wid in pairs:
+        _workshop_users_cache.pop(wid)
+        _user_workshops_cache.pop(uid)
+        keys.update((f"uw:workshop:{wid}", f"uw:user:{uid}"))
+    await shared_delete(*keys)
+
 
 class UserWorkshopService:
     """Service for managing user-workshop relationships"""
 
     @staticmethod
-    def register_user_to_workshop(registration_data: RegisterUserToWorkshopSchema) -> UserWorkshopRelation:
+    async def register_user_to_workshop(registration_data: RegisterUserToWorkshopSchema) -> UserWorkshopRelation:
         """Register a user to a workshop"""
         try:
-            log.debug(f"Registering user {registration_data.user_id} to workshop {registration_data.workshop_id}")
+            log.debug("Registering user %s to workshop %s", registration_data.user_id, registration_data.workshop_id)
             
-            # Check if already registered
-            existing = get_db().table("user_workshop") \
-                .select("*") \
-                .eq("user_id", str(registration_data.user_id)) \
-                .eq("workshop_id", str(registration_data.workshop_id)) \
-                .execute()
+            uid, wid = str(registration_data.user_id), str(registration_data.workshop_id)
+            insert_data = {
+                "user_id": uid,
+                "workshop_id": wid,
+                "reminder_1day_sent": False,
+                "reminder_15min_sent": False
+            }
             
-            if existing.data:
+            # One round-trip: (user_id, workshop_id) is the primary key, so a duplicate
+            # registration fails the insert with a unique violation instead of a pre-check
+            try:
+                response = await get_async_db().table("user_workshop").insert(insert_data).execute()
+            except APIError as e:
+                if e.code != UNIQUE_VIOLATION:
+                    raise
                 log.warning(f"User {registration_data.user_id} already registered for workshop {registration_data.workshop_id}")
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="User already registered for this workshop"
                 )
             
-            # Register user
-            insert_data = {
-                "user_id": str(registration_data.user_id),
-                "workshop_id": str(registration_data.workshop_id),
-                "reminder_1day_sent": False,
-                "reminder_15min_sent": False
-            }
-            
-            response = get_db().table("user_workshop").insert(insert_data).execute()
-            
             if not response.data:
                 log.error("Failed to register user - no data returned")
                 raise HTTPException(
@@ -60,14 +117,16 @@ class UserWorkshopService:
                 )
             
             registered_data = response.data[0]
+            await _invalidate_registration_lists([(uid, wid)])
             log.info(f"User {registration_data.user_id} successfully registered to workshop {registration_data.workshop_id}")
             
-            return UserWorkshopRelation(
-                user_id=UUID(registered_data["user_id"]),
-                workshop_id=UUID(registered_data["workshop_id"]),
-                created_at=datetime.fromisoformat(registered_data["created_at"].replace('Z', '+00:00')),
-                reminder_1day_sent=registered_data.get("reminder_1day_sent"),
-                reminder_15min_sent=registered_data.get("reminder_15min_sent")
+            # Only created_at comes from the DB; everything else is what we just inserted
+            return UserWorkshopRelation.model_construct(
+                user_id=registration_data.user_id,
+                workshop_id=registration_data.workshop_id,
+                created_at=_parse_ts(registered_data["created_at"]),
+                reminder_1day_sent=False,
+                reminder_15min_sent=False
             )
             
         except HTTPException:
@@ -81,20 +140,19 @@ class UserWorkshopService:
             )
 
     @staticmethod
-    def get_workshop_users(workshop_id: UUID) -> FetchWorkshopUsersResponse:
+    async def get_workshop_users(workshop_id: UUID) -> FetchWorkshopUsersResponse:
         """Get all users registered for a specific workshop"""
         try:
-            log.debug(f"Fetching users for workshop: {workshop_id}")
-            
-            response = get_db().table("user_workshop") \
-                .select("""
-                    user_id,
-                    created_at,
-                    reminder_1day_sent,
-                    reminder_15min_sent,
-                    user:users(id, name, email, profile_pic_url, points, role)
-                """) \
-                .eq("workshop_id", str(workshop_id)) \
+            wid = str(workshop_id)
+            cached = await _get_cached_list(_workshop_users_cache, "uw:workshop", wid, FetchWorkshopUsersResponse)
+            if cached is not None:
+                return cached
+            
+            log.debug("Fetching users for workshop: %s", workshop_id)
+            
+            response = await get_async_db().table("user_workshop") \
+                .select(_WORKSHOP_USERS_SELECT) \
+                .eq("workshop_id", wid) \
                 .execute()
             
             if not response.data:
@@ -105,29 +163,35 @@ class UserWorkshopService:
                     users=[]
                 )
             
+            # Rows come from our own schema with ids/timestamps parsed here, so skip re-validation.
+            # Bound once: the loop runs per participant
             users = []
+            append, parse_ts, to_uuid = users.append, _parse_ts, UUID
             for item in response.data:
-                user_data = item.get("user", {})
-                if user_data:
-                    users.append(WorkshopUser(
-                        user_id=UUID(item["user_id"]),
-                        name=user_data.get("name"),
-                        email=user_data["email"],
-                        profile_pic_url=user_data.get("profile_pic_url"),
-                        points=user_data.get("points"),
-                        role=user_data.get("role"),
-                        reminder_1day_sent=item.get("reminder_1day_sent"),
-                        reminder_15min_sent=item.get("reminder_15min_sent"),
-                        created_at=datetime.fromisoformat(item["created_at"].replace('Z', '+00:00'))
-                    ))
+                user_data = item.get("user")
+                if not user_data:
+                    continue
+                append(WorkshopUser.model_construct(
+                    user_id=to_uuid(item["user_id"]),
+                    name=user_data.get("name"),
+                    email=user_data["email"],
+                    profile_pic_url=user_data.get("profile_pic_url"),
+                    points=user_data.get("points"),
+                    role=user_data.get("role"),
+                    reminder_1day_sent=item.get("reminder_1day_sent"),
+                    reminder_15min_sent=item.get("reminder_15min_sent"),
+                    created_at=parse_ts(item["created_at"])
+                ))
             
             log.info(f"Found {len(users)} users for workshop {workshop_id}")
             
-            return FetchWorkshopUsersResponse(
+            result = FetchWorkshopUsersResponse.model_construct(
                 workshop_id=workshop_id,
                 total_participants=len(users),
                 users=users
             )
+            await _set_cached_list(_workshop_users_cache, "uw:workshop", wid, result)
+            return result
             
         except Exception as e:
             log.exception(f"Error fetching workshop users for {workshop_id}")
@@ -137,20 +201,49 @@ class UserWorkshopService:
             )
 
     @staticmethod
-    def get_user_workshops(user_id: UUID) -> FetchUsersWorkshopsResponse:
+    async def stream_workshop_users_ndjson(workshop_id: UUID) -> AsyncIterator[bytes]:
+        """
+        Yield a workshop's participants as NDJSON lines (WorkshopUser shape), oldest registration first.
+        Rows are fetched in STREAM_CHUNK_SIZE pages, so memory stays flat for any workshop size.
+        Errors can't become HTTP responses mid-stream; they end the stream and are logged.
+        """
+        wid = str(workshop_id)
+        db = get_async_db()
+        offset = 0
+        try:
+            while True:
+                response = await db.table("user_workshop") \
+                    .select(_WORKSHOP_USERS_SELECT) \
+                    .eq("workshop_id", wid) \
+                    .order("created_at").order("user_id") \
+                    .range(offset, offset + STREAM_CHUNK_SIZE - 1) \
+                    .execute()
+                rows = response.data or []
+                for item in rows:
+                    user_data = item.pop("user", None)
+                    if user_data:
+                        item.update(user_data)
+                        yield ndjson_line(item)
+                if len(rows) < STREAM_CHUNK_SIZE:
+                    break
+                offset += STREAM_CHUNK_SIZE
+        except Exception:
+            log.exception(f"Error streaming workshop users for {workshop_id}")
+
+    @staticmethod
+    async def get_user_workshops(user_id: UUID) -> FetchUsersWorkshopsResponse:
         """Get all workshops a user is registered for"""
         try:
-            log.debug(f"Fetching workshops for user: {user_id}")
-            
-            response = get_db().table("user_workshop") \
-                .select("""
-                    workshop_id,
-                    created_at,
-                    reminder_1day_sent,
-                    reminder_15min_sent,
-                    workshop:workshops(id, title, description, technologies, conducted_by, scheduled_at)
-                """) \
-                .eq("user_id", str(user_id)) \
+            uid = str(user_id)
+            cached = await _get_cached_list(_user_workshops_cache, "uw:user", uid, FetchUsersWorkshopsResponse)
+            if cached is not None:
+                return cached
+            
+            log.debug("Fetching workshops for user: %s", user_id)
+            
+            response = await get_async_db().table("user_workshop") \
+                .select(_USER_WORKSHOPS_SELECT) \
+                .eq("user_id", uid) \
                 .execute()
             
             if not response.data:
@@ -161,29 +254,35 @@ class UserWorkshopService:
                     workshops=[]
                 )
             
+            # Rows come from our own schema with ids/timestamps parsed here, so skip re-validation.
+            # Bound once: the loop runs per registration
             workshops = []
+            append, parse_ts, to_uuid = workshops.append, _parse_ts, UUID
             for item in response.data:
-                workshop_data = item.get("workshop", {})
-                if workshop_data:
-                    workshops.append(UserWorkshop(
-                        workshop_id=UUID(item["workshop_id"]),
-                        title=workshop_data.get("title"),
-                        description=workshop_data.get("description"),
-                        technologies=workshop_data.get("technologies"),
-                        conducted_by=workshop_data.get("conducted_by"),
-                        scheduled_at=datetime.fromisoformat(workshop_data["scheduled_at"]) if workshop_data.get("scheduled_at") else None,
-                        reminder_1day_sent=item.get("reminder_1day_sent"),
-                        reminder_15min_sent=item.get("reminder_15min_sent"),
-                        registration_date=datetime.fromisoformat(item["created_at"].replace('Z', '+00:00'))
-                    ))
+                workshop_data = item.get("workshop")
+                if not workshop_data:
+                    continue
+                append(UserWorkshop.model_construct(
+                    workshop_id=to_uuid(item["workshop_id"]),
+                    title=workshop_data.get("title"),
+                    description=workshop_data.get("description"),
+                    technologies=workshop_data.get("technologies"),
+                    conducted_by=workshop_data.get("conducted_by"),
+                    scheduled_at=parse_ts(workshop_data["scheduled_at"]) if workshop_data.get("scheduled_at") else None,
+                    reminder_1day_sent=item.get("reminder_1day_sent"),
+                    reminder_15min_sent=item.get("reminder_15min_sent"),
+                    registration_date=parse_ts(item["created_at"])
+                ))
             
             log.info(f"Found {len(workshops)} workshops for user {user_id}")
             
-            return FetchUsersWorkshopsResponse(
+            result = FetchUsersWorkshopsResponse.model_construct(
                 user_id=user_id,
                 total_workshops=len(workshops),
                 workshops=workshops
             )
+            await _set_cached_list(_user_workshops_cache, "uw:user", uid, result)
+            return result
             
         except Exception as e:
             log.exception(f"Error fetching user workshops for {user_id}")
@@ -193,10 +292,36 @@ class UserWorkshopService:
             )
 
     @staticmethod
-    def update_reminder_status(reminder_data: UpdateReminderStatusSchema) -> UserWorkshopRelation:
+    async def get_workshops_counts(user_ids: List[UUID]) -> Dict[UUID, int]:
+        """Get the number of registered workshops for each user, in one query"""
+        try:
+            if not user_ids:
+                return {}
+            
+            log.debug("Counting workshops for %s users", len(user_ids))
+            
+            response = await get_async_db().rpc(
+                "count_workshops_for_users",
+                {"ids": [str(user_id) for user_id in user_ids]}
+            ).execute()
+            
+            counts = dict.fromkeys(user_ids, 0)
+            for row in response.data:
+                counts[UUID(row["user_id"])] = row["workshop_count"]
+            return counts
+            
+        except Exception as e:
+            log.exception(f"Error counting workshops for users")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to count user workshops"
+            )
+
+    @staticmethod
+    async def update_reminder_status(reminder_data: UpdateReminderStatusSchema) -> UserWorkshopRelation:
         """Update reminder status for a user-workshop relationship"""
         try:
-            log.debug(f"Updating reminder status for user {reminder_data.user_id}, workshop {reminder_data.workshop_id}")
+            log.debug("Updating reminder status for user %s, workshop %s", reminder_data.user_id, reminder_data.workshop_id)
             
             update_data = {}
             if reminder_data.reminder_1day_sent is not None:
@@ -211,10 +336,11 @@ class UserWorkshopService:
                     detail="At least one reminder status must be provided"
                 )
             
-            response = get_db_admin().table("user_workshop") \
+            uid, wid = str(reminder_data.user_id), str(reminder_data.workshop_id)
+            response = await get_async_db_admin().table("user_workshop") \
                 .update(update_data) \
-                .eq("user_id", str(reminder_data.user_id)) \
-                .eq("workshop_id", str(reminder_data.workshop_id)) \
+                .eq("user_id", uid) \
+                .eq("workshop_id", wid) \
                 .execute()
             
             if not response.data:
@@ -225,12 +351,14 @@ class UserWorkshopService:
                 )
             
             updated_data = response.data[0]
+            await _invalidate_registration_lists([(uid, wid)])
             log.info(f"Reminder status updated for user {reminder_data.user_id}, workshop {reminder_data.workshop_id}")
             
-            return UserWorkshopRelation(
-                user_id=UUID(updated_data["user_id"]),
-                workshop_id=UUID(updated_data["workshop_id"]),
-                created_at=datetime.fromisoformat(updated_data["created_at"].replace('Z', '+00:00')),
+            # The ids are the filter we matched on; only created_at needs parsing
+            return UserWorkshopRelation.model_construct(
+                user_id=reminder_data.user_id,
+                workshop_id=reminder_data.workshop_id,
+                created_at=_parse_ts(updated_data["created_at"]),
                 reminder_1day_sent=updated_data.get("reminder_1day_sent"),
                 reminder_15min_sent=updated_data.get("reminder_15min_sent")
             )
@@ -246,15 +374,79 @@ class UserWorkshopService:
             )
 
     @staticmethod
-    def unregister_user_from_workshop(user_id: UUID, workshop_id: UUID) -> bool:
+    async def bulk_update_reminder_status(items: List[UpdateReminderStatusSchema]) -> List[UserWorkshopRelation]:
+        """Update reminder status for many registrations, one request per (workshop, status) group"""
+        try:
+            log.debug("Bulk updating reminder status for %s registrations", len(items))
+            
+            # A reminder run touches one workshop with the same flags for every user,
+            # so grouping usually collapses the whole batch into a single UPDATE ... IN (...)
+            groups = {}
+            for item in items:
+                update_data = {}
+                if item.reminder_1day_sent is not None:
+                    update_data["reminder_1day_sent"] = item.reminder_1day_sent
+                if item.reminder_15min_sent is not None:
+                    update_data["reminder_15min_sent"] = item.reminder_15min_sent
+                
+                if not update_data:
+                    log.warning(f"No reminder status provided for user {item.user_id}, workshop {item.workshop_id}")
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="At least one reminder status must be provided"
+                    )
+                
+                key = (str(item.workshop_id), tuple(sorted(update_data.items())))
+                groups.setdefault(key, set()).add(str(item.user_id))
+            
+            db = get_async_db_admin()
+            responses = await asyncio.gather(*(
+                db.table("user_workshop")
+                    .update(dict(update_items))
+                    .eq("workshop_id", workshop_id)
+                    .in_("user_id", list(user_ids))
+                    .execute()
+                for (workshop_id, update_items), user_ids in groups.items()
+            ))
+            
+            updated = []
+            for response in responses:
+                for row in response.data:
+                    updated.append(UserWorkshopRelation(
+                        user_id=UUID(row["user_id"]),
+                        workshop_id=UUID(row["workshop_id"]),
+                        created_at=_parse_ts(row["created_at"]),
+                        reminder_1day_sent=row.get("reminder_1day_sent"),
+                        reminder_15min_sent=row.get("reminder_15min_sent")
+                    ))
+            await _invalidate_registration_lists(
+                (row["user_id"], row["workshop_id"]) for response in responses for row in response.data
+            )
+            
+            log.info(f"Reminder status updated for {len(updated)} of {len(items)} registrations in {len(groups)} requests")
+            return updated
+            
+        except HTTPException:
+            # Re-raise HTTPExceptions as-is
+            raise
+        except Exception as e:
+            log.exception(f"Unexpected error bulk updating reminder status")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to update reminder status"
+            )
+
+    @staticmethod
+    async def unregister_user_from_workshop(user_id: UUID, workshop_id: UUID) -> bool:
         """Remove user registration from workshop"""
         try:
-            log.debug(f"Unregistering user {user_id} from workshop {workshop_id}")
+            log.debug("Unregistering user %s from workshop %s", user_id, workshop_id)
             
-            response = get_db_admin().table("user_workshop") \
+            uid, wid = str(user_id), str(workshop_id)
+            response = await get_async_db_admin().table("user_workshop") \
                 .delete() \
-                .eq("user_id", str(user_id)) \
-                .eq("workshop_id", str(workshop_id)) \
+                .eq("user_id", uid) \
+                .eq("workshop_id", wid) \
                 .execute()
             
             if not response.data:
@@ -264,6 +456,7 @@ class UserWorkshopService:
                     detail="User registration not found for this workshop"
                 )
             
+            await _invalidate_registration_lists([(uid, wid)])
             log.info(f"User {user_id} successfully unregistered from workshop {workshop_id}")
             return True
             
@@ -278,46 +471,36 @@ class UserWorkshopService:
             )
 
     @staticmethod
-    def get_users_needing_reminders(workshop_id: UUID, reminder_type: str) -> List[WorkshopUser]:
+    async def get_users_needing_reminders(workshop_id: UUID, reminder_type: str) -> List[WorkshopUser]:
         """Get users who need reminders for a specific workshop"""
         try:
-            log.debug(f"Fetching users needing {reminder_type} reminders for workshop: {workshop_id}")
+            log.debug("Fetching users needing %s reminders for workshop: %s", reminder_type, workshop_id)
             
-            if reminder_type not in ["1day", "15min"]:
+            field_name = _FIELD_BY_KIND.get(reminder_type)
+            if field_name is None:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid reminder type. Must be '1day' or '15min'"
                 )
             
-            field_name = f"reminder_{reminder_type}_sent"
-            
-            response = get_db().table("user_workshop") \
-                .select(f"""
-                    user_id,
-                    created_at,
-                    reminder_1day_sent,
-                    reminder_15min_sent,
-                    user:users(id, name, email, profile_pic_url, points, role)
-                """) \
-                .eq("workshop_id", str(workshop_id)) \
-                .eq(field_name, False) \
-                .execute()
+            # RPC filters on the one flag being sent and returns only the columns a send needs
+            response = await get_async_db().rpc(
+                "get_pending_reminders",
+                {"wid": str(workshop_id), "kind": reminder_type}
+            ).execute()
             
+            # Rows come from our own function with ids/timestamps parsed here, so skip re-validation.
+            # Bound once: the loop runs per participant
             users = []
+            append, parse_ts, to_uuid = users.append, _parse_ts, UUID
             for item in response.data:
-                user_data = item.get("user", {})
-                if user_data:
-                    users.append(WorkshopUser(
-                        user_id=UUID(item["user_id"]),
-                        name=user_data.get("name"),
-                        email=user_data["email"],
-                        profile_pic_url=user_data.get("profile_pic_url"),
-                        points=user_data.get("points"),
-                        role=user_data.get("role"),
-                        reminder_1day_sent=item.get("reminder_1day_sent"),
-                        reminder_15min_sent=item.get("reminder_15min_sent"),
-                        created_at=datetime.fromisoformat(item["created_at"].replace('Z', '+00:00'))
-                    ))
+                append(WorkshopUser.model_construct(
+                    user_id=to_uuid(item["user_id"]),
+                    name=item.get("name"),
+                    email=item["email"],
+                    created_at=parse_ts(item["created_at"]),
+                    **{field_name: False}
+                ))
             
             log.info(f"Found {len(users)} users needing {reminder_type} reminders for workshop {workshop_id}")
             return users
@@ -2,7 +2,10 @@
 from uuid import UUID
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException, status
-from app.core.db import get_db, get_db_admin
+from pydantic import TypeAdapter
+from app.core.cache import async_ttl_cached
+from app.core.config import settings
+from app.core.db import get_async_db, get_async_db_admin
 from app.schemas.workshop import WorkshopCreate, WorkshopUpdate, WorkshopOut, WorkshopFilters, WorkshopStats
 from app.core.logger import setup_logger
 from datetime import datetime
@@ -11,12 +14,27 @@ from zoneinfo import ZoneInfo
 log = setup_logger(__name__)
 IST = ZoneInfo("Asia/Kolkata")
 
+# Stored columns the API returns; keeps the search_tsv tsvector out of every read
+WORKSHOP_COLUMNS = "id,created_at,title,description,technologies,conducted_by,scheduled_at"
+
+# Validates a whole result set in one pydantic-core call (computed fields still run per row)
+_workshops_adapter = TypeAdapter(List[WorkshopOut])
+
+# Homepage reads (upcoming list, stats); also dropped on every workshop write
+WORKSHOP_READS_TTL = 60  # seconds
+
 class WorkshopService:
 
     @staticmethod
-    def create_workshop(data: WorkshopCreate) -> WorkshopOut:
+    def _invalidate_cached_reads() -> None:
+        """Drop cached upcoming lists and stats after a workshop is created, changed or removed"""
+        WorkshopService._fetch_upcoming_rows.cache_clear()
+        WorkshopService._fetch_stats_data.cache_clear()
+
+    @staticmethod
+    async def create_workshop(data: WorkshopCreate) -> WorkshopOut:
         """Create a new workshop with proper validation"""
-        db = get_db_admin()  # Use admin DB for write operations
+        db = get_async_db_admin()  # Use admin DB for write operations
         try:
             # Convert datetime to proper format for database
             insert_data = data.model_dump()
@@ -27,7 +45,7 @@ class WorkshopService:
             
             log.debug(f"Creating workshop: {insert_data['title']}")
             
-            response = db.table("workshops").insert(insert_data).execute()
+            response = await db.table("workshops").insert(insert_data).execute()
             
             if not response.data:
                 log.error("Failed to create workshop - no data returned")
@@ -37,6 +55,7 @@ class WorkshopService:
                 )
             
             created_workshop = response.data[0]
+            WorkshopService._invalidate_cached_reads()
             log.info(f"Workshop created: {created_workshop['title']} (ID: {created_workshop['id']})")
             
             return WorkshopOut(**created_workshop)
@@ -51,13 +70,52 @@ class WorkshopService:
             )
 
     @staticmethod
-    def get_workshop_by_id(workshop_id: UUID) -> WorkshopOut:
+    async def create_workshops_bulk(items: List[WorkshopCreate]) -> List[WorkshopOut]:
+        """Create many workshops with one insert (one round-trip, one transaction)"""
+        db = get_async_db_admin()  # Use admin DB for write operations
+        try:
+            if not items:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="At least one workshop must be provided"
+                )
+            
+            # mode="json" formats scheduled_at as ISO strings, as create_workshop does by hand
+            payload = [item.model_dump(mode="json") for item in items]
+            
+            log.debug(f"Creating {len(payload)} workshops")
+            
+            response = await db.table("workshops").insert(payload).execute()
+            
+            if not response.data:
+                log.error("Failed to create workshops - no data returned")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to create workshops"
+                )
+            
+            WorkshopService._invalidate_cached_reads()
+            log.info(f"{len(response.data)} workshops created")
+            
+            return _workshops_adapter.validate_python(response.data)
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            log.error(f"Error creating workshops in bulk: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}"
+            )
+
+    @staticmethod
+    async def get_workshop_by_id(workshop_id: UUID) -> WorkshopOut:
         """Get workshop by ID with error handling"""
-        db = get_db()
+        db = get_async_db()
         try:
             log.debug(f"Fetching workshop: {workshop_id}")
             
-            response = db.table("workshops").select("*").eq("id", str(workshop_id)).execute()
+            response = await db.table("workshops").select(WORKSHOP_COLUMNS).eq("id", str(workshop_id)).execute()
             
             if not response.data or len(response.data) == 0:
                 log.warning(f"Workshop not found: {workshop_id}")
@@ -81,41 +139,38 @@ class WorkshopService:
             )
 
     @staticmethod
-    def update_workshop(workshop_id: UUID, data: WorkshopUpdate) -> WorkshopOut:
+    async def update_workshop(workshop_id: UUID, data: WorkshopUpdate) -> WorkshopOut:
         """Update workshop with validation"""
-        db = get_db_admin()  # Use admin DB for write operations
+        db = get_async_db_admin()  # Use admin DB for write operations
         try:
             log.debug(f"Updating workshop: {workshop_id}")
             
-            # Check if workshop exists first
-            existing_response = db.table("workshops").select("*").eq("id", str(workshop_id)).execute()
-            if not existing_response.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Workshop with ID {workshop_id} not found"
-                )
-            
             # Prepare update data (only include non-None values)
             update_data = {k: v for k, v in data.model_dump(exclude_unset=True).items() if v is not None}
             
             if not update_data:
-                log.debug("No data provided for update")
-                return WorkshopOut(**existing_response.data[0])
+                # Rejected before any DB call, like empty user/review updates
+                log.warning(f"No fields provided for workshop update: {workshop_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No fields to update"
+                )
             
             # Convert datetime to proper format
             if 'scheduled_at' in update_data and isinstance(update_data['scheduled_at'], datetime):
                 update_data['scheduled_at'] = update_data['scheduled_at'].isoformat()
             
-            response = db.table("workshops").update(update_data).eq("id", str(workshop_id)).execute()
+            # One round-trip: the update returns the row, and no row means no such workshop
+            response = await db.table("workshops").update(update_data).eq("id", str(workshop_id)).execute()
             
             if not response.data:
-                log.error(f"Failed to update workshop: {workshop_id}")
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Update operation failed"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Workshop with ID {workshop_id} not found"
                 )
             
             updated_workshop = response.data[0]
+            WorkshopService._invalidate_cached_reads()
             log.info(f"Workshop updated: {updated_workshop['title']}")
             
             return WorkshopOut(**updated_workshop)
@@ -130,31 +185,23 @@ class WorkshopService:
             )
 
     @staticmethod
-    def delete_workshop(workshop_id: UUID) -> Dict[str, str]:
+    async def delete_workshop(workshop_id: UUID) -> Dict[str, str]:
         """Delete workshop with validation"""
-        db = get_db_admin()  # Use admin DB for write operations
+        db = get_async_db_admin()  # Use admin DB for write operations
         try:
             log.debug(f"Deleting workshop: {workshop_id}")
             
-            # Check if workshop exists first
-            existing_response = db.table("workshops").select("*").eq("id", str(workshop_id)).execute()
-            if not existing_response.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Workshop with ID {workshop_id} not found"
-                )
-            
-            workshop_title = existing_response.data[0]['title']
-            
-            response = db.table("workshops").delete().eq("id", str(workshop_id)).execute()
+            # One round-trip: the delete returns the removed row, and no row means no such workshop
+            response = await db.table("workshops").delete().eq("id", str(workshop_id)).execute()
             
             if not response.data:
-                log.error(f"Failed to delete workshop: {workshop_id}")
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Delete operation failed"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Workshop with ID {workshop_id} not found"
                 )
             
+            workshop_title = response.data[0]['title']
+            WorkshopService._invalidate_cached_reads()
             log.info(f"Workshop deleted: {workshop_title}")
             return {
                 "message": "Workshop deleted successfully", 
@@ -171,84 +218,90 @@ class WorkshopService:
                 detail=f"Error deleting workshop: {str(e)}"
             )
 
-    # app/services/workshop.py
-    # Fix the list_workshops method
     @staticmethod
-    def list_workshops(filters: WorkshopFilters) -> Dict[str, Any]:
-        """List workshops with advanced filtering and pagination"""
-        db = get_db()
-        try:
-            log.debug(f"Listing workshops with filters: page={filters.page}, search='{filters.search}'")
-            
-            # Start with base query
-            query = db.table("workshops").select("*")
-
-            # Apply filters
-            if filters.search:
-                # Search in both title and description
-                query = query.or_(f"title.ilike.%{filters.search}%,description.ilike.%{filters.search}%")
+    def _apply_filters(query, filters: WorkshopFilters):
+        """Apply the list filters (search, technology, instructor, date range) to a workshops query"""
+        if filters.search:
+            # Search in both title and description
+            if settings.WORKSHOP_SEARCH_FULL_TEXT:
+                # search_tsv is a GIN-indexed tsvector over title + description;
+                # websearch syntax accepts arbitrary user input without tsquery errors
+                query = query.text_search(
+                    "search_tsv", filters.search,
+                    options={"config": "english", "type": "web_search"}
+                )
+            else:
+                pattern = f"%{filters.search}%"
+                query = query.or_(f"title.ilike.{pattern},description.ilike.{pattern}")
 
-            if filters.technology:
-                # Check if technology exists in the technologies array
-                query = query.contains("technologies", [filters.technology])
+        if filters.technology:
+            # Check if technology exists in the technologies array
+            query = query.contains("technologies", [filters.technology])
 
-            if filters.instructor:
+        if filters.instructor:
+            if filters.instructor_exact:
+                # Served pre-sorted by workshops_instructor_scheduled_idx (conducted_by, scheduled_at)
+                query = query.eq("conducted_by", filters.instructor)
+            else:
                 query = query.ilike("conducted_by", f"%{filters.instructor}%")
 
-            if filters.from_date:
-                query = query.gte("scheduled_at", filters.from_date.isoformat())
+        if filters.from_date:
+            query = query.gte("scheduled_at", filters.from_date.isoformat())
 
-            if filters.to_date:
-                query = query.lte("scheduled_at", filters.to_date.isoformat())
+        if filters.to_date:
+            query = query.lte("scheduled_at", filters.to_date.isoformat())
 
-            # 🔧 Fix: Get total count properly
-            try:
-                # First get count using head() method
-                count_query = db.table("workshops").select("id")
-                
-                # Apply same filters to count query
-                if filters.search:
-                    count_query = count_query.or_(f"title.ilike.%{filters.search}%,description.ilike.%{filters.search}%")
-                if filters.technology:
-                    count_query = count_query.contains("technologies", [filters.technology])
-                if filters.instructor:
-                    count_query = count_query.ilike("conducted_by", f"%{filters.instructor}%")
-                if filters.from_date:
-                    count_query = count_query.gte("scheduled_at", filters.from_date.isoformat())
-                if filters.to_date:
-                    count_query = count_query.lte("scheduled_at", filters.to_date.isoformat())
-                
-                # Use head() with count to get total count
-                count_response = count_query.execute()
-                total = len(count_response.data or [])
-                
-            except Exception as count_error:
-                log.warning(f"Count query failed: {count_error}, using fallback method")
-                # Fallback: get all data and count manually
-                try:
-                    fallback_response = db.table("workshops").select("id").execute()
-                    total = len(fallback_response.data or [])
-                except:
-                    total = 0
+        return query
 
-            # Apply pagination and ordering
-            start_range = (filters.page - 1) * filters.page_size
-            end_range = start_range + filters.page_size - 1
+    @staticmethod
+    async def list_workshops(filters: WorkshopFilters) -> Dict[str, Any]:
+        """List workshops with advanced filtering and pagination"""
+        db = get_async_db()
+        try:
+            log.debug(f"Listing workshops with filters: page={filters.page}, search='{filters.search}'")
             
-            response = (
-                query
-                .order("scheduled_at", desc=False)
-                .range(start_range, end_range)
-                .execute()
-            )
+            keyset = filters.after_scheduled_at is not None and filters.after_id is not None
+
+            # Page mode: the page and its filtered total come back in one request.
+            # Keyset mode skips the count; it would only cover rows past the cursor, at full cost.
+            query = db.table("workshops").select(WORKSHOP_COLUMNS, count=None if keyset else "exact")
+            query = WorkshopService._apply_filters(query, filters)
+
+            # Apply ordering; id breaks scheduled_at ties so pages never overlap or skip rows
+            query = query.order("scheduled_at", desc=False).order("id", desc=False)
+            
+            if keyset:
+                # (scheduled_at, id) > cursor: an index range scan on (scheduled_at, id), no OFFSET
+                after = filters.after_scheduled_at.isoformat()
+                query = query.or_(
+                    f'scheduled_at.gt."{after}",'
+                    f'and(scheduled_at.eq."{after}",id.gt.{filters.after_id})'
+                ).limit(filters.page_size)
+            else:
+                start_range = (filters.page - 1) * filters.page_size
+                end_range = start_range + filters.page_size - 1
+                query = query.range(start_range, end_range)
+            
+            response = await query.execute()
 
             workshops_data = response.data or []
-            workshops = [WorkshopOut(**row) for row in workshops_data]
-            
-            # Calculate pagination info
-            has_next = total > filters.page * filters.page_size
-            has_prev = filters.page > 1
-            total_pages = (total + filters.page_size - 1) // filters.page_size
+            workshops = _workshops_adapter.validate_python(workshops_data)
+            
+            # Calculate pagination info; total/total_pages are null in keyset mode
+            if keyset:
+                total = total_pages = None
+                has_next = len(workshops) == filters.page_size
+                has_prev = True
+            else:
+                total = response.count or 0
+                total_pages = (total + filters.page_size - 1) // filters.page_size
+                has_next = total > filters.page * filters.page_size
+                has_prev = filters.page > 1
+            
+            next_cursor = None
+            if has_next and workshops:
+                last = workshops[-1]
+                next_cursor = {"after_scheduled_at": last.scheduled_at, "after_id": last.id}
             
             log.debug(f"Found {len(workshops)} workshops (total: {total})")
 
@@ -261,6 +314,7 @@ class WorkshopService:
                     "total_pages": total_pages,
                     "has_next": has_next,
                     "has_prev": has_prev,
+                    "next_cursor": next_cursor,
                 },
                 "filters_applied": {
                     "search": filters.search,
@@ -277,24 +331,40 @@ class WorkshopService:
                 detail=f"Error fetching workshops: {str(e)}"
             )
 
+    # The homepage caches hold raw rows / RPC payloads: models are built per request so
+    # is_upcoming, time_until_workshop and current_time_ist are never served stale.
+    @staticmethod
+    @async_ttl_cached(key=lambda limit: limit, ttl=WORKSHOP_READS_TTL, maxsize=16)
+    async def _fetch_upcoming_rows(limit: int) -> List[Dict[str, Any]]:
+        """Raw rows of the next `limit` workshops"""
+        db = get_async_db()
+        current_time = datetime.now(IST).isoformat()
+        response = await (
+            db.table("workshops")
+            .select(WORKSHOP_COLUMNS)
+            .gte("scheduled_at", current_time)
+            .order("scheduled_at", desc=False)
+            .limit(limit)
+            .execute()
+        )
+        return response.data or []
+
     @staticmethod
-    def get_upcoming_workshops(limit: int = 10) -> List[WorkshopOut]:
+    @async_ttl_cached(key=lambda: "stats", ttl=WORKSHOP_READS_TTL, maxsize=1)
+    async def _fetch_stats_data() -> Dict[str, Any]:
+        """Raw workshop_stats() payload"""
+        db = get_async_db()
+        # Counts, technology histogram and next workshop are aggregated in Postgres
+        return (await db.rpc("workshop_stats").execute()).data or {}
+
+    @staticmethod
+    async def get_upcoming_workshops(limit: int = 10) -> List[WorkshopOut]:
         """Get upcoming workshops ordered by date"""
-        db = get_db()
         try:
-            current_time = datetime.now(IST).isoformat()
-            
-            response = (
-                db.table("workshops")
-                .select("*")
-                .gte("scheduled_at", current_time)
-                .order("scheduled_at", desc=False)
-                .limit(limit)
-                .execute()
-            )
-            
-            workshops_data = response.data or []
-            return [WorkshopOut(**row) for row in workshops_data]
+            workshops_data = await WorkshopService._fetch_upcoming_rows(limit)
+            workshops = _workshops_adapter.validate_python(workshops_data)
+            # Rows are cached; drop any that started since they were fetched
+            return [workshop for workshop in workshops if workshop.is_upcoming]
             
         except Exception as e:
             log.error(f"Error fetching upcoming workshops: {str(e)}")
@@ -304,49 +374,23 @@ class WorkshopService:
             )
 
     @staticmethod
-    def get_workshop_stats() -> WorkshopStats:
+    async def get_workshop_stats() -> WorkshopStats:
         """Get workshop statistics"""
-        db = get_db()
         try:
             log.debug("Generating workshop statistics")
             
-            # Get all workshops
-            response = db.table("workshops").select("*").execute()
-            workshops = response.data or []
+            data = await WorkshopService._fetch_stats_data()
             
             current_time = datetime.now(IST)
             
-            # Calculate stats
-            total_workshops = len(workshops)
-            upcoming_workshops = len([
-                w for w in workshops 
-                if datetime.fromisoformat(w['scheduled_at'].replace('Z', '+00:00')).astimezone(IST) > current_time
-            ])
+            total_workshops = data.get("total", 0)
+            upcoming_workshops = data.get("upcoming", 0)
             past_workshops = total_workshops - upcoming_workshops
+            popular_technologies = data.get("popular_technologies") or []
+            active_instructors = data.get("active_instructors", 0)
             
-            # Count technologies
-            tech_counter = {}
-            for workshop in workshops:
-                for tech in workshop.get('technologies', []):
-                    tech_counter[tech] = tech_counter.get(tech, 0) + 1
-            
-            popular_technologies = [
-                {"tech": tech, "count": count} 
-                for tech, count in sorted(tech_counter.items(), key=lambda x: x[1], reverse=True)[:10]
-            ]
-            
-            # Count active instructors
-            active_instructors = len(set(w['conducted_by'] for w in workshops if w.get('conducted_by')))
-            
-            # Get next workshop
-            next_workshop = None
-            upcoming = [
-                w for w in workshops 
-                if datetime.fromisoformat(w['scheduled_at'].replace('Z', '+00:00')).astimezone(IST) > current_time
-            ]
-            if upcoming:
-                next_workshop_data = min(upcoming, key=lambda x: x['scheduled_at'])
-                next_workshop = WorkshopOut(**next_workshop_data)
+            next_workshop_data = data.get("next_workshop")
+            next_workshop = WorkshopOut(**next_workshop_data) if next_workshop_data else None
             
             # Get current IST time for stats
             current_ist_str = current_time.strftime("%d %B %Y, %I:%M %p IST")
@@ -372,20 +416,20 @@ class WorkshopService:
             )
 
     @staticmethod
-    def search_workshops_by_technology(technology: str) -> List[WorkshopOut]:
+    async def search_workshops_by_technology(technology: str) -> List[WorkshopOut]:
         """Search workshops by specific technology"""
-        db = get_db()
+        db = get_async_db()
         try:
-            response = (
+            response = await (
                 db.table("workshops")
-                .select("*")
+                .select(WORKSHOP_COLUMNS)
                 .contains("technologies", [technology])
                 .order("scheduled_at", desc=False)
                 .execute()
             )
             
             workshops_data = response.data or []
-            return [WorkshopOut(**row) for row in workshops_data]
+            return _workshops_adapter.validate_python(workshops_data)
             
         except Exception as e:
             log.error(f"Error searching workshops by technology '{technology}': {str(e)}")
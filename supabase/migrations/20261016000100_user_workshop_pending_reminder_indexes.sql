@@ -0,0 +1,11 @@
+-- Partial indexes for the reminder cron.
+-- Almost every historical enrollment already has its reminders sent, so indexing
+-- only the unsent rows keeps these indexes proportional to pending work.
+
+CREATE INDEX IF NOT EXISTS idx_user_workshop_pending_1day
+    ON public.user_workshop (workshop_id)
+    WHERE reminder_1day_sent = false;
+
+CREATE INDEX IF NOT EXISTS idx_user_workshop_pending_15min
+    ON public.user_workshop (workshop_id)
+    WHERE reminder_15min_sent = false;
@@ -0,0 +1,15 @@
+-- Per-recipient outcome of each reminder run.
+-- The reminder endpoints only return totals; individual results are kept here.
+
+CREATE TABLE IF NOT EXISTS public.reminder_log (
+    id          bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    user_id     uuid NOT NULL,
+    workshop_id uuid NOT NULL,
+    kind        text NOT NULL CHECK (kind IN ('1day', '15min')),
+    status      text NOT NULL CHECK (status IN ('sent', 'failed')),
+    message     text,
+    created_at  timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_reminder_log_workshop_kind
+    ON public.reminder_log (workshop_id, kind);
@@ -0,0 +1,28 @@
+-- Enrollments due a 15-minute reminder, resolved entirely in Postgres.
+-- Window matches the previous client-side check: (now(), now() + 15 minutes].
+
+CREATE INDEX IF NOT EXISTS idx_workshops_scheduled_at
+    ON public.workshops (scheduled_at);
+
+CREATE OR REPLACE FUNCTION public.pending_15min_reminders()
+RETURNS TABLE (
+    user_id      uuid,
+    workshop_id  uuid,
+    name         text,
+    email        text,
+    title        text,
+    scheduled_at timestamptz
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT uw.user_id, uw.workshop_id, u.name::text, u.email::text, w.title::text, w.scheduled_at
+    FROM public.workshops w
+    JOIN public.user_workshop uw
+      ON uw.workshop_id = w.id
+     AND uw.reminder_15min_sent = false
+    JOIN public.users u
+      ON u.id = uw.user_id
+    WHERE w.scheduled_at >  now()
+      AND w.scheduled_at <= now() + interval '15 minutes';
+$$;
@@ -0,0 +1,30 @@
+-- Flag a whole run of delivered reminders in one statement.
+-- pairs: [{"user_id": "...", "workshop_id": "..."}, ...], which: '1day' | '15min'
+
+CREATE OR REPLACE FUNCTION public.mark_reminders_sent(pairs jsonb, which text)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated integer;
+BEGIN
+    IF which = '1day' THEN
+        UPDATE public.user_workshop uw
+           SET reminder_1day_sent = true
+          FROM jsonb_to_recordset(pairs) AS p(user_id uuid, workshop_id uuid)
+         WHERE uw.user_id = p.user_id
+           AND uw.workshop_id = p.workshop_id;
+    ELSIF which = '15min' THEN
+        UPDATE public.user_workshop uw
+           SET reminder_15min_sent = true
+          FROM jsonb_to_recordset(pairs) AS p(user_id uuid, workshop_id uuid)
+         WHERE uw.user_id = p.user_id
+           AND uw.workshop_id = p.workshop_id;
+    ELSE
+        RAISE EXCEPTION 'unknown reminder kind: %', which;
+    END IF;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
@@ -0,0 +1,22 @@
+-- Reminder counters for enrollments in upcoming workshops, aggregated in one row.
+
+CREATE OR REPLACE FUNCTION public.get_reminder_stats()
+RETURNS TABLE (
+    total_active  bigint,
+    sent_1day     bigint,
+    sent_15min    bigint,
+    pending_1day  bigint,
+    pending_15min bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT count(*)                                          AS total_active,
+           count(*) FILTER (WHERE uw.reminder_1day_sent)     AS sent_1day,
+           count(*) FILTER (WHERE uw.reminder_15min_sent)    AS sent_15min,
+           count(*) FILTER (WHERE uw.reminder_1day_sent IS NOT TRUE)  AS pending_1day,
+           count(*) FILTER (WHERE uw.reminder_15min_sent IS NOT TRUE) AS pending_15min
+    FROM public.user_workshop uw
+    JOIN public.workshops w ON w.id = uw.workshop_id
+    WHERE w.scheduled_at > now();
+$$;
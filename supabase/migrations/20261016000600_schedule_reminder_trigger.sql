@@ -0,0 +1,44 @@
+-- Drive the reminder endpoints from pg_cron instead of an external poller.
+-- The scan runs inside Postgres; the API (which holds the Brevo key and templates)
+-- is only called when at least one reminder is actually due.
+--
+-- Set the API base URL once per project:
+--   ALTER DATABASE postgres SET app.api_base_url = 'https://your-api.example.com';
+
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+CREATE EXTENSION IF NOT EXISTS pg_net;
+
+CREATE OR REPLACE FUNCTION public.trigger_due_reminders()
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    base_url text := current_setting('app.api_base_url', true);
+BEGIN
+    IF base_url IS NULL OR base_url = '' THEN
+        RAISE NOTICE 'app.api_base_url is not set; skipping reminder trigger';
+        RETURN;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1
+        FROM public.user_workshop uw
+        JOIN public.workshops w ON w.id = uw.workshop_id
+        WHERE uw.reminder_1day_sent = false
+          AND w.scheduled_at >  now()
+          AND w.scheduled_at <= now() + interval '24 hours'
+    ) THEN
+        PERFORM net.http_post(url := base_url || '/api/v1/api/notifications/send-1day-reminders');
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM public.pending_15min_reminders()) THEN
+        PERFORM net.http_post(url := base_url || '/api/v1/api/notifications/send-15min-reminders');
+    END IF;
+END;
+$$;
+
+SELECT cron.schedule(
+    'workshop-reminders',
+    '*/5 * * * *',
+    $$SELECT public.trigger_due_reminders()$$
+);
@@ -0,0 +1,59 @@
+-- Single-column key for user_workshop rows.
+-- (user_id, workshop_id) stays the primary key; id gives bulk updates a
+-- one-column predicate: WHERE id = ANY(ids).
+
+ALTER TABLE public.user_workshop
+    ADD COLUMN IF NOT EXISTS id uuid NOT NULL DEFAULT gen_random_uuid();
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_user_workshop_id
+    ON public.user_workshop (id);
+
+-- Return the enrollment id alongside the pending 15-minute reminders
+DROP FUNCTION IF EXISTS public.pending_15min_reminders();
+
+CREATE FUNCTION public.pending_15min_reminders()
+RETURNS TABLE (
+    id           uuid,
+    user_id      uuid,
+    workshop_id  uuid,
+    name         text,
+    email        text,
+    title        text,
+    scheduled_at timestamptz
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT uw.id, uw.user_id, uw.workshop_id, u.name::text, u.email::text, w.title::text, w.scheduled_at
+    FROM public.workshops w
+    JOIN public.user_workshop uw
+      ON uw.workshop_id = w.id
+     AND uw.reminder_15min_sent = false
+    JOIN public.users u
+      ON u.id = uw.user_id
+    WHERE w.scheduled_at >  now()
+      AND w.scheduled_at <= now() + interval '15 minutes';
+$$;
+
+-- Mark delivered reminders by enrollment id instead of (user_id, workshop_id) pairs
+DROP FUNCTION IF EXISTS public.mark_reminders_sent(jsonb, text);
+
+CREATE FUNCTION public.mark_reminders_sent(ids uuid[], which text)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated integer;
+BEGIN
+    IF which = '1day' THEN
+        UPDATE public.user_workshop SET reminder_1day_sent = true WHERE id = ANY(ids);
+    ELSIF which = '15min' THEN
+        UPDATE public.user_workshop SET reminder_15min_sent = true WHERE id = ANY(ids);
+    ELSE
+        RAISE EXCEPTION 'unknown reminder kind: %', which;
+    END IF;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
@@ -0,0 +1,5 @@
+-- One review per user per workshop, enforced by the database.
+-- Lets create_review insert with ON CONFLICT DO NOTHING instead of checking first.
+
+CREATE UNIQUE INDEX IF NOT EXISTS reviews_user_workshop_uniq
+    ON public.reviews (user_id, workshop_id);
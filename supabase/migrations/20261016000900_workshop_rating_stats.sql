@@ -0,0 +1,26 @@
+-- Rating summary for one workshop: average, count and 1-5 histogram in a single row.
+
+CREATE OR REPLACE FUNCTION public.workshop_rating_stats(wid uuid)
+RETURNS TABLE (
+    avg_rating numeric,
+    total      bigint,
+    r1         bigint,
+    r2         bigint,
+    r3         bigint,
+    r4         bigint,
+    r5         bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT avg(rating),
+           count(*),
+           count(*) FILTER (WHERE rating = 1),
+           count(*) FILTER (WHERE rating = 2),
+           count(*) FILTER (WHERE rating = 3),
+           count(*) FILTER (WHERE rating = 4),
+           count(*) FILTER (WHERE rating = 5)
+    FROM public.reviews
+    WHERE workshop_id = wid
+      AND rating IS NOT NULL;
+$$;
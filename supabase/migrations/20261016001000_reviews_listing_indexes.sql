@@ -0,0 +1,19 @@
+-- Indexes shaped after the review list/stats queries.
+-- Pages are "WHERE workshop_id|user_id = ? ORDER BY created_at DESC LIMIT n"; with the
+-- remaining review columns INCLUDEd, Postgres can serve a page as an index-only range scan.
+-- (Plain CREATE INDEX: migrations run inside a transaction, so CONCURRENTLY is not allowed.
+--  On a large live table, run these by hand with CONCURRENTLY first.)
+
+CREATE INDEX IF NOT EXISTS idx_reviews_workshop_created
+    ON public.reviews (workshop_id, created_at DESC)
+    INCLUDE (id, user_id, rating, review_description);
+
+CREATE INDEX IF NOT EXISTS idx_reviews_user_created
+    ON public.reviews (user_id, created_at DESC)
+    INCLUDE (id, workshop_id, rating, review_description);
+
+-- workshop_rating_stats() only aggregates rated rows
+CREATE INDEX IF NOT EXISTS idx_reviews_workshop_rating
+    ON public.reviews (workshop_id)
+    INCLUDE (rating)
+    WHERE rating IS NOT NULL;
@@ -0,0 +1,91 @@
+-- Per-workshop rating counters kept up to date by a trigger on reviews, so reading
+-- the stats is a primary-key lookup instead of re-aggregating reviews every time.
+-- Counts per star bucket (not a running average) so deletes/updates stay exact.
+
+ALTER TABLE public.workshops
+    ADD COLUMN IF NOT EXISTS rating_1 bigint NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_2 bigint NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_3 bigint NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_4 bigint NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_5 bigint NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.bump_workshop_rating(wid uuid, stars integer, delta integer)
+RETURNS void
+LANGUAGE sql
+AS $$
+    UPDATE public.workshops
+    SET rating_1 = rating_1 + CASE WHEN stars = 1 THEN delta ELSE 0 END,
+        rating_2 = rating_2 + CASE WHEN stars = 2 THEN delta ELSE 0 END,
+        rating_3 = rating_3 + CASE WHEN stars = 3 THEN delta ELSE 0 END,
+        rating_4 = rating_4 + CASE WHEN stars = 4 THEN delta ELSE 0 END,
+        rating_5 = rating_5 + CASE WHEN stars = 5 THEN delta ELSE 0 END
+    WHERE id = wid
+      AND stars BETWEEN 1 AND 5;
+$$;
+
+-- Only the trigger should move the counters, not API callers
+REVOKE EXECUTE ON FUNCTION public.bump_workshop_rating(uuid, integer, integer) FROM PUBLIC, anon, authenticated;
+
+CREATE OR REPLACE FUNCTION public.update_workshop_rating()
+RETURNS trigger
+LANGUAGE plpgsql
+-- Runs as owner: review authors must not need UPDATE rights on workshops
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.rating IS NOT NULL THEN
+        PERFORM public.bump_workshop_rating(OLD.workshop_id, OLD.rating, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.rating IS NOT NULL THEN
+        PERFORM public.bump_workshop_rating(NEW.workshop_id, NEW.rating, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS reviews_update_workshop_rating ON public.reviews;
+CREATE TRIGGER reviews_update_workshop_rating
+    AFTER INSERT OR DELETE OR UPDATE OF rating, workshop_id ON public.reviews
+    FOR EACH ROW EXECUTE FUNCTION public.update_workshop_rating();
+
+-- Backfill from existing reviews
+UPDATE public.workshops w
+SET rating_1 = s.r1, rating_2 = s.r2, rating_3 = s.r3, rating_4 = s.r4, rating_5 = s.r5
+FROM (
+    SELECT workshop_id,
+           count(*) FILTER (WHERE rating = 1) AS r1,
+           count(*) FILTER (WHERE rating = 2) AS r2,
+           count(*) FILTER (WHERE rating = 3) AS r3,
+           count(*) FILTER (WHERE rating = 4) AS r4,
+           count(*) FILTER (WHERE rating = 5) AS r5
+    FROM public.reviews
+    GROUP BY workshop_id
+) s
+WHERE w.id = s.workshop_id;
+
+-- Same signature and shape as before; now reads the counters instead of scanning reviews
+CREATE OR REPLACE FUNCTION public.workshop_rating_stats(wid uuid)
+RETURNS TABLE (
+    avg_rating numeric,
+    total      bigint,
+    r1         bigint,
+    r2         bigint,
+    r3         bigint,
+    r4         bigint,
+    r5         bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT (rating_1 + 2 * rating_2 + 3 * rating_3 + 4 * rating_4 + 5 * rating_5)::numeric
+               / NULLIF(rating_1 + rating_2 + rating_3 + rating_4 + rating_5, 0),
+           rating_1 + rating_2 + rating_3 + rating_4 + rating_5,
+           rating_1, rating_2, rating_3, rating_4, rating_5
+    FROM public.workshops
+    WHERE id = wid
+    UNION ALL
+    -- Unknown workshop: keep returning exactly one empty row like the old aggregate did
+    SELECT NULL, 0, 0, 0, 0, 0, 0
+    WHERE NOT EXISTS (SELECT 1 FROM public.workshops WHERE id = wid);
+$$;
@@ -0,0 +1,50 @@
+-- Profile update + completion check + one-time 10 point reward in a single atomic call.
+-- patch carries only the UserUpdate fields that were actually sent (name, profile_pic_url).
+-- Returns {"user": <users row>, "newly_completed": bool}, or NULL when the user doesn't exist.
+
+CREATE OR REPLACE FUNCTION public.update_user_and_check_profile(uid uuid, patch jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    was_complete  boolean;
+    now_complete  boolean;
+    u             public.users;
+BEGIN
+    -- Row lock: two concurrent updates can't both see "incomplete" and award twice
+    SELECT coalesce(profile_complete, false) INTO was_complete
+    FROM public.users
+    WHERE id = uid
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE public.users
+    SET name            = CASE WHEN patch ? 'name' THEN patch ->> 'name' ELSE name END,
+        profile_pic_url = CASE WHEN patch ? 'profile_pic_url' THEN patch ->> 'profile_pic_url' ELSE profile_pic_url END
+    WHERE id = uid
+    RETURNING * INTO u;
+
+    -- Same rule as UserService.PROFILE_REQUIRED_FIELDS: every required field non-blank
+    now_complete := nullif(btrim(u.name), '') IS NOT NULL
+                AND nullif(btrim(u.profile_pic_url), '') IS NOT NULL;
+
+    IF now_complete AND NOT was_complete THEN
+        UPDATE public.users
+        SET profile_complete = true,
+            points = coalesce(points, 0) + 10
+        WHERE id = uid
+        RETURNING * INTO u;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'user', to_jsonb(u),
+        'newly_completed', now_complete AND NOT was_complete
+    );
+END;
+$$;
+
+-- Only the service-role client (UserService.update_user) calls this, after UserUpdate validation
+REVOKE EXECUTE ON FUNCTION public.update_user_and_check_profile(uuid, jsonb) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,15 @@
+-- Atomic points increment: no read-modify-write in the API, so concurrent awards can't lose updates.
+-- Returns the updated users row; no rows when the user doesn't exist.
+
+CREATE OR REPLACE FUNCTION public.increment_points(uid uuid, delta integer)
+RETURNS SETOF public.users
+LANGUAGE sql
+AS $$
+    UPDATE public.users
+    SET points = coalesce(points, 0) + delta
+    WHERE id = uid
+    RETURNING *;
+$$;
+
+-- Only the service-role client awards points, not API callers
+REVOKE EXECUTE ON FUNCTION public.increment_points(uuid, integer) FROM PUBLIC, anon, authenticated;
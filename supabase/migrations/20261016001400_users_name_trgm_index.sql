@@ -0,0 +1,8 @@
+-- User search runs "profile_complete AND name ILIKE '%q%'"; a leading wildcard can't use a
+-- btree, but a trigram GIN index can. Partial: only completed profiles are searchable.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm
+    ON public.users USING gin (name gin_trgm_ops)
+    WHERE profile_complete;
@@ -0,0 +1,53 @@
+-- update_user_and_check_profile: skip the UPDATE when the patch doesn't change anything,
+-- so re-saving an unchanged profile writes no new row version / WAL.
+
+CREATE OR REPLACE FUNCTION public.update_user_and_check_profile(uid uuid, patch jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    u             public.users;
+    new_name      text;
+    new_pic       text;
+    was_complete  boolean;
+    now_complete  boolean;
+BEGIN
+    -- Row lock: two concurrent updates can't both see "incomplete" and award twice
+    SELECT * INTO u
+    FROM public.users
+    WHERE id = uid
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    was_complete := coalesce(u.profile_complete, false);
+    new_name := CASE WHEN patch ? 'name' THEN patch ->> 'name' ELSE u.name END;
+    new_pic  := CASE WHEN patch ? 'profile_pic_url' THEN patch ->> 'profile_pic_url' ELSE u.profile_pic_url END;
+
+    -- Same rule as UserService.PROFILE_REQUIRED_FIELDS: every required field non-blank
+    now_complete := nullif(btrim(new_name), '') IS NOT NULL
+                AND nullif(btrim(new_pic), '') IS NOT NULL;
+
+    IF (new_name, new_pic) IS DISTINCT FROM (u.name, u.profile_pic_url)
+       OR (now_complete AND NOT was_complete) THEN
+        UPDATE public.users
+        SET name             = new_name,
+            profile_pic_url  = new_pic,
+            profile_complete = CASE WHEN now_complete AND NOT was_complete THEN true ELSE profile_complete END,
+            points           = CASE WHEN now_complete AND NOT was_complete
+                                    THEN coalesce(points, 0) + 10 ELSE points END
+        WHERE id = uid
+        RETURNING * INTO u;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'user', to_jsonb(u),
+        'newly_completed', now_complete AND NOT was_complete
+    );
+END;
+$$;
+
+-- Only the service-role client (UserService.update_user) calls this, after UserUpdate validation
+REVOKE EXECUTE ON FUNCTION public.update_user_and_check_profile(uuid, jsonb) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,33 @@
+-- Users of one workshop still owed a reminder, with only the columns a send needs.
+-- The unsent-row filters are served by the partial indexes from 20261016000100.
+
+CREATE OR REPLACE FUNCTION public.get_pending_reminders(wid uuid, kind text)
+RETURNS TABLE (
+    user_id    uuid,
+    name       text,
+    email      text,
+    created_at timestamptz
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    IF kind = '1day' THEN
+        RETURN QUERY
+        SELECT uw.user_id, u.name::text, u.email::text, uw.created_at
+        FROM public.user_workshop uw
+        JOIN public.users u ON u.id = uw.user_id
+        WHERE uw.workshop_id = wid
+          AND uw.reminder_1day_sent = false;
+    ELSIF kind = '15min' THEN
+        RETURN QUERY
+        SELECT uw.user_id, u.name::text, u.email::text, uw.created_at
+        FROM public.user_workshop uw
+        JOIN public.users u ON u.id = uw.user_id
+        WHERE uw.workshop_id = wid
+          AND uw.reminder_15min_sent = false;
+    ELSE
+        RAISE EXCEPTION 'unknown reminder kind: %', kind;
+    END IF;
+END;
+$$;
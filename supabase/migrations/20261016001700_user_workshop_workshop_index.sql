@@ -0,0 +1,11 @@
+-- Participant lookups ("WHERE workshop_id = ?") had only the partial reminder indexes;
+-- the (user_id, workshop_id) primary key already serves per-user and per-pair lookups,
+-- including the duplicate-registration unique check.
+-- With the registration columns INCLUDEd, a participant list is an index-only scan.
+-- (Plain CREATE INDEX: migrations run inside a transaction, so CONCURRENTLY is not allowed.
+--  On a large live table, run this by hand with CONCURRENTLY first.)
+-- The unsent-reminder partial indexes live in 20261016000100.
+
+CREATE UNIQUE INDEX IF NOT EXISTS user_workshop_pair_idx
+    ON public.user_workshop (workshop_id, user_id)
+    INCLUDE (reminder_1day_sent, reminder_15min_sent, created_at);
@@ -0,0 +1,17 @@
+-- Registration counts for many users in one query, for admin listings.
+-- Users without registrations are simply absent from the result.
+-- user_id is the leading primary key column, so each id is an index range lookup.
+
+CREATE OR REPLACE FUNCTION public.count_workshops_for_users(ids uuid[])
+RETURNS TABLE (
+    user_id        uuid,
+    workshop_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT uw.user_id, count(*)
+    FROM public.user_workshop uw
+    WHERE uw.user_id = ANY(ids)
+    GROUP BY uw.user_id;
+$$;
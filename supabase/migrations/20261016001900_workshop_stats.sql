@@ -0,0 +1,33 @@
+-- Workshop dashboard numbers in one call: counts, top technologies, instructor
+-- count and the next workshop row, instead of shipping every workshop to the API.
+-- The upcoming/past split and next workshop use idx_workshops_scheduled_at.
+
+CREATE OR REPLACE FUNCTION public.workshop_stats()
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'total',              (SELECT count(*) FROM public.workshops),
+        'upcoming',           (SELECT count(*) FROM public.workshops WHERE scheduled_at > now()),
+        'active_instructors', (SELECT count(DISTINCT conducted_by) FROM public.workshops
+                               WHERE conducted_by IS NOT NULL AND conducted_by <> ''),
+        'popular_technologies', coalesce((
+            SELECT json_agg(json_build_object('tech', t.tech, 'count', t.n) ORDER BY t.n DESC, t.tech)
+            FROM (
+                SELECT tech, count(*) AS n
+                FROM public.workshops, unnest(technologies) AS tech
+                GROUP BY tech
+                ORDER BY n DESC, tech
+                LIMIT 10
+            ) t
+        ), '[]'::json),
+        'next_workshop', (
+            SELECT row_to_json(w)
+            FROM public.workshops w
+            WHERE w.scheduled_at > now()
+            ORDER BY w.scheduled_at
+            LIMIT 1
+        )
+    );
+$$;
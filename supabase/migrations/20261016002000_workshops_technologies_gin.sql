@@ -0,0 +1,7 @@
+-- Technology filters use PostgREST's cs operator (technologies @> '{tech}'),
+-- which a GIN index on the array serves as a bitmap index scan instead of a seq scan.
+-- (Plain CREATE INDEX: migrations run inside a transaction, so CONCURRENTLY is not allowed.
+--  On a large live table, run this by hand with CONCURRENTLY first.)
+
+CREATE INDEX IF NOT EXISTS workshops_technologies_gin
+    ON public.workshops USING GIN (technologies array_ops);
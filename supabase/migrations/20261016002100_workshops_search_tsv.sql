@@ -0,0 +1,47 @@
+-- Full-text search for the workshop list: a stored tsvector over title + description
+-- with a GIN index, queried through PostgREST's fts operators.
+-- (Plain CREATE INDEX: migrations run inside a transaction, so CONCURRENTLY is not allowed.
+--  On a large live table, run this by hand with CONCURRENTLY first.)
+
+ALTER TABLE public.workshops
+    ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS workshops_search_gin
+    ON public.workshops USING GIN (search_tsv);
+
+-- Keep the tsvector out of workshop_stats(): next_workshop lists the API columns explicitly
+CREATE OR REPLACE FUNCTION public.workshop_stats()
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'total',              (SELECT count(*) FROM public.workshops),
+        'upcoming',           (SELECT count(*) FROM public.workshops WHERE scheduled_at > now()),
+        'active_instructors', (SELECT count(DISTINCT conducted_by) FROM public.workshops
+                               WHERE conducted_by IS NOT NULL AND conducted_by <> ''),
+        'popular_technologies', coalesce((
+            SELECT json_agg(json_build_object('tech', t.tech, 'count', t.n) ORDER BY t.n DESC, t.tech)
+            FROM (
+                SELECT tech, count(*) AS n
+                FROM public.workshops, unnest(technologies) AS tech
+                GROUP BY tech
+                ORDER BY n DESC, tech
+                LIMIT 10
+            ) t
+        ), '[]'::json),
+        'next_workshop', (
+            SELECT row_to_json(w)
+            FROM (
+                SELECT id, created_at, title, description, technologies, conducted_by, scheduled_at
+                FROM public.workshops
+                WHERE scheduled_at > now()
+                ORDER BY scheduled_at
+                LIMIT 1
+            ) w
+        )
+    );
+$$;
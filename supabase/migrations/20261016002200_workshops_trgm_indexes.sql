@@ -0,0 +1,14 @@
+-- Substring filters on workshops: the instructor filter is always "conducted_by ILIKE '%q%'",
+-- and search falls back to title/description ILIKE when WORKSHOP_SEARCH_FULL_TEXT is off.
+-- Leading wildcards can't use a btree; trigram GIN indexes turn these into bitmap index scans.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS workshops_title_trgm
+    ON public.workshops USING gin (title gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS workshops_desc_trgm
+    ON public.workshops USING gin (description gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS workshops_instr_trgm
+    ON public.workshops USING gin (conducted_by gin_trgm_ops);
@@ -0,0 +1,7 @@
+-- Keyset pagination for the workshop list: ORDER BY scheduled_at, id with a
+-- "(scheduled_at, id) > cursor" predicate is a single range scan on this index.
+-- (Plain CREATE INDEX: migrations run inside a transaction, so CONCURRENTLY is not allowed.
+--  On a large live table, run this by hand with CONCURRENTLY first.)
+
+CREATE INDEX IF NOT EXISTS workshops_scheduled_at_id_idx
+    ON public.workshops (scheduled_at, id);
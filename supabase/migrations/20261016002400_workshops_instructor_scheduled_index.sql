@@ -0,0 +1,7 @@
+-- "All workshops by instructor X" (instructor_exact=true) filters conducted_by = X and
+-- orders by scheduled_at; this index serves both, so the plan has no sort node.
+-- (Plain CREATE INDEX: migrations run inside a transaction, so CONCURRENTLY is not allowed.
+--  On a large live table, run this by hand with CONCURRENTLY first.)
+
+CREATE INDEX IF NOT EXISTS workshops_instructor_scheduled_idx
+    ON public.workshops (conducted_by, scheduled_at);
@@ -0,0 +1,16 @@
+-- Review pages order by (created_at DESC, id DESC) and continue after a (created_at, id)
+-- cursor: reviews from one bulk insert share a created_at, so id breaks the tie.
+-- These replace the (workshop_id|user_id, created_at) indexes from 20261016001000.
+-- (Plain CREATE INDEX: migrations run inside a transaction, so CONCURRENTLY is not allowed.
+--  On a large live table, run these by hand with CONCURRENTLY first.)
+
+CREATE INDEX IF NOT EXISTS idx_reviews_workshop_created_id
+    ON public.reviews (workshop_id, created_at DESC, id DESC)
+    INCLUDE (user_id, rating, review_description);
+
+CREATE INDEX IF NOT EXISTS idx_reviews_user_created_id
+    ON public.reviews (user_id, created_at DESC, id DESC)
+    INCLUDE (workshop_id, rating, review_description);
+
+DROP INDEX IF EXISTS public.idx_reviews_workshop_created;
+DROP INDEX IF EXISTS public.idx_reviews_user_created;
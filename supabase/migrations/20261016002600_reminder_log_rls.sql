@@ -0,0 +1,5 @@
+-- reminder_log holds per-recipient outcomes and error text; keep it away from the
+-- anon/authenticated PostgREST roles. No policies: only the service role (which
+-- bypasses RLS) reads or writes it.
+
+ALTER TABLE public.reminder_log ENABLE ROW LEVEL SECURITY;